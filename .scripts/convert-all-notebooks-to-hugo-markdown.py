@@ -2,6 +2,7 @@ from pathlib import Path
 
 import typer
 from helpers.markdown import NotebookToHugoMarkdownConverter, ParsingException
+from helpers.search_index import SearchIndexBuilder
 from loguru import logger
 
 MAIN_DIR = Path(__file__).resolve().parent.parent
@@ -11,8 +12,10 @@ MAIN_DIR = Path(__file__).resolve().parent.parent
 
 def main(
     overwrite: bool = False,
+    search_index: bool = True,
 ):
-    converter = NotebookToHugoMarkdownConverter()
+    search_index_builder = SearchIndexBuilder() if search_index else None
+    converter = NotebookToHugoMarkdownConverter(search_index=search_index_builder)
 
     for notebook_path in MAIN_DIR.glob("**/*.ipynb"):
         relative_notebook_dir = notebook_path.relative_to(MAIN_DIR).parent.parent
@@ -50,6 +53,7 @@ def main(
                 notebook_path.relative_to(MAIN_DIR),
                 output_md_file.relative_to(MAIN_DIR),
             )
+            converter.index_markdown_file(output_md_file)
             continue
 
         logger.info(
@@ -61,6 +65,19 @@ def main(
         except ParsingException as e:
             logger.error("Could not convert {}: {}", notebook_path, e)
 
+    # The search index is served by the landing page as static files
+    if search_index_builder is not None:
+        search_index_dir = (
+            MAIN_DIR / ".dist" / "qdrant-landing" / "static" / "search-index"
+        )
+        manifest = search_index_builder.write(search_index_dir)
+        logger.info(
+            "Wrote search index of {} documents in {} shards to {}",
+            manifest["documents"],
+            len(manifest["shards"]),
+            search_index_dir.relative_to(MAIN_DIR),
+        )
+
 
 if __name__ == "__main__":
     typer.run(main)
@@ -0,0 +1,59 @@
+import os
+from pathlib import Path
+
+import typer
+from helpers.execution import CellOutputCache, NotebookExecutor, execute_notebooks
+from loguru import logger
+
+MAIN_DIR = Path(__file__).resolve().parent.parent
+CACHE_DIR = MAIN_DIR / ".cache" / "notebook-outputs"
+
+
+def main(
+    notebooks: list[Path] = typer.Argument(
+        None, help="Notebooks to execute. All the notebooks are executed by default."
+    ),
+    workers: int = typer.Option(
+        os.cpu_count() or 1, help="Number of parallel kernels."
+    ),
+    kernel: str = "python3",
+    timeout: int = typer.Option(600, help="Timeout of a single cell, in seconds."),
+    skip_tag: str = typer.Option(
+        "skip-execution", help="Cells with this tag are never executed."
+    ),
+    use_cache: bool = typer.Option(True, help="Reuse the cached outputs of cells."),
+):
+    notebook_paths = [path.resolve() for path in notebooks or []] or sorted(
+        path
+        for path in MAIN_DIR.glob("**/*.ipynb")
+        if ".ipynb_checkpoints" not in path.parts
+    )
+    logger.info(
+        "Executing {} notebooks on up to {} kernels", len(notebook_paths), workers
+    )
+
+    executor = NotebookExecutor(
+        CellOutputCache(CACHE_DIR),
+        kernel_name=kernel,
+        timeout=timeout,
+        skip_tag=skip_tag,
+        use_cache=use_cache,
+    )
+    results = execute_notebooks(executor, notebook_paths, workers)
+
+    for result in results:
+        logger.info(
+            "{}: {} executed, {} cached, {} skipped cells in {:.1f}s{}",
+            result.notebook_path,
+            result.executed_cells,
+            result.cached_cells,
+            result.skipped_cells,
+            result.seconds,
+            f" (failed: {result.error})" if result.error else "",
+        )
+    if any(result.error for result in results):
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
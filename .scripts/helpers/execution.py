@@ -0,0 +1,248 @@
+import hashlib
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import nbformat
+from loguru import logger
+from nbclient import NotebookClient
+from nbclient.exceptions import CellExecutionError, CellTimeoutError, DeadKernelError
+from nbformat import NotebookNode
+
+
+@dataclass
+class ExecutionResult:
+    """
+    A summary of a single notebook execution.
+    """
+
+    notebook_path: Path
+    executed_cells: int = 0
+    cached_cells: int = 0
+    skipped_cells: int = 0
+    seconds: float = 0.0
+    error: str | None = None
+    failed_cell: int | None = None
+
+
+class CellOutputCache:
+    """
+    A cache of code cell outputs, stored as JSON files. Each entry is keyed by a chained hash of the cell source and
+    the sources of all the code cells before it, so an entry is only valid if nothing upstream of the cell changed.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self._cache_dir = cache_dir
+
+    def _path(self, key: str) -> Path:
+        return self._cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> list | None:
+        """
+        Get the cached outputs of a cell.
+        :param key: The chained hash of the cell.
+        :return: The list of outputs, or None if the cell is not cached.
+        """
+        path = self._path(key)
+        if not path.exists():
+            return None
+        with open(path) as f:
+            return [nbformat.from_dict(output) for output in json.load(f)]
+
+    def put(self, key: str, outputs: list):
+        """
+        Store the outputs of an executed cell.
+        :param key: The chained hash of the cell.
+        :param outputs: The outputs of the cell.
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Notebooks sharing the same cells may write the same entry concurrently
+        temporary_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        with open(temporary_path, "w") as f:
+            json.dump(outputs, f)
+        temporary_path.replace(path)
+
+
+class NotebookExecutor:
+    """
+    Executes Jupyter notebooks in place, reusing the cached outputs of the cells that did not change. A kernel is only
+    started if at least one code cell is not cached. Cells before the first changed one are then re-executed to rebuild
+    the kernel state, but they keep their cached outputs.
+    """
+
+    def __init__(
+        self,
+        cache: CellOutputCache,
+        kernel_name: str = "python3",
+        timeout: int = 600,
+        skip_tag: str = "skip-execution",
+        use_cache: bool = True,
+    ):
+        self._cache = cache
+        self._kernel_name = kernel_name
+        self._timeout = timeout
+        self._skip_tag = skip_tag
+        self._use_cache = use_cache
+
+    def chain_hashes(self, notebook: NotebookNode) -> dict[int, str]:
+        """
+        Calculate the chained hash of every code cell in the notebook. Markdown cells do not affect the execution, so
+        they are not part of the chain.
+        :param notebook: The notebook to hash.
+        :return: A mapping from the index of each code cell to its hash.
+        """
+        hashes = {}
+        previous_hash = hashlib.sha256(self._kernel_name.encode()).hexdigest()
+        for index, cell in enumerate(notebook.cells):
+            if cell.cell_type != "code":
+                continue
+            previous_hash = hashlib.sha256(
+                f"{previous_hash}\0{cell.source}".encode()
+            ).hexdigest()
+            hashes[index] = previous_hash
+        return hashes
+
+    def _is_skipped(self, cell: NotebookNode) -> bool:
+        return self._skip_tag in cell.get("metadata", {}).get("tags", [])
+
+    def execute(self, notebook_path: Path) -> ExecutionResult:
+        """
+        Execute a notebook and save the outputs to the same file. A failed notebook is reported in the result and left
+        untouched, so the source is never overwritten with the outputs of a partial run.
+        :param notebook_path: The path to the notebook to execute.
+        :return: The summary of the execution.
+        """
+        start_time = time.perf_counter()
+        result = ExecutionResult(notebook_path)
+        try:
+            notebook = self._execute_notebook(notebook_path, result)
+            nbformat.write(notebook, notebook_path)
+        except (CellExecutionError, CellTimeoutError, DeadKernelError) as e:
+            result.error = self._describe_error(e, result.failed_cell)
+            logger.error("Execution of {} failed: {}", notebook_path, result.error)
+        except Exception as e:
+            # Kernel startup and IO errors only fail this notebook, not the whole run
+            result.error = self._describe_error(e, result.failed_cell)
+            logger.exception("Execution of {} failed: {}", notebook_path, result.error)
+        result.seconds = time.perf_counter() - start_time
+        return result
+
+    @staticmethod
+    def _describe_error(error: Exception, cell_index: int | None) -> str:
+        """
+        Describe an execution error in one line, e.g. "cell 3: KeyError: 'name'".
+        :param error: The error raised while executing the notebook.
+        :param cell_index: The index of the cell that failed, if the error was raised by a cell.
+        :return: The description of the error.
+        """
+        if isinstance(error, CellExecutionError):
+            # The message is the whole cell source and traceback, the exception itself is more telling
+            message = f"{error.ename}: {error.evalue}" if error.evalue else error.ename
+        else:
+            message = str(error).strip()
+            message = message.splitlines()[0] if message else repr(error)
+        return message if cell_index is None else f"cell {cell_index}: {message}"
+
+    def _execute_notebook(
+        self, notebook_path: Path, result: ExecutionResult
+    ) -> NotebookNode:
+        """
+        Read the notebook and fill in the outputs of its code cells, from the cache or by executing them.
+        """
+        notebook = nbformat.read(notebook_path, as_version=4)
+        hashes = self.chain_hashes(notebook)
+
+        # Find the first code cell with no cached outputs, everything from there on has to be executed
+        cached_outputs = {}
+        first_changed = None
+        for index, key in hashes.items():
+            if self._is_skipped(notebook.cells[index]):
+                continue
+            outputs = self._cache.get(key) if self._use_cache else None
+            if outputs is None:
+                first_changed = index
+                break
+            cached_outputs[index] = outputs
+
+        if first_changed is None:
+            for index, outputs in cached_outputs.items():
+                notebook.cells[index].outputs = outputs
+            result.cached_cells = len(cached_outputs)
+            result.skipped_cells = len(hashes) - len(cached_outputs)
+            logger.info("All cells of {} are cached", notebook_path.name)
+        else:
+            self._execute_cells(
+                notebook,
+                notebook_path,
+                hashes,
+                first_changed,
+                cached_outputs,
+                result,
+            )
+        return notebook
+
+    def _execute_cells(
+        self,
+        notebook: NotebookNode,
+        notebook_path: Path,
+        hashes: dict[int, str],
+        first_changed: int,
+        cached_outputs: dict[int, list],
+        result: ExecutionResult,
+    ):
+        """
+        Execute the code cells on a new kernel, running in the notebook directory, and cache the new outputs.
+        """
+        client = NotebookClient(
+            notebook,
+            kernel_name=self._kernel_name,
+            timeout=self._timeout,
+            resources={"metadata": {"path": str(notebook_path.parent)}},
+        )
+        with client.setup_kernel():
+            for index, cell in enumerate(notebook.cells):
+                if cell.cell_type != "code":
+                    continue
+                if self._is_skipped(cell):
+                    result.skipped_cells += 1
+                    continue
+
+                try:
+                    client.execute_cell(cell, index)
+                except Exception:
+                    result.failed_cell = index
+                    raise
+                if index in cached_outputs:
+                    # Only run to rebuild the kernel state, the outputs stay as they were cached
+                    cell.outputs = cached_outputs[index]
+                    result.cached_cells += 1
+                else:
+                    self._cache.put(hashes[index], cell.outputs)
+                    result.executed_cells += 1
+
+        logger.info(
+            "Executed {} from cell {}: {} cells executed, {} cached",
+            notebook_path.name,
+            first_changed,
+            result.executed_cells,
+            result.cached_cells,
+        )
+
+
+def execute_notebooks(
+    executor: NotebookExecutor, notebook_paths: list[Path], workers: int
+) -> list[ExecutionResult]:
+    """
+    Execute the notebooks in parallel. Each notebook runs on its own kernel, so at most `workers` kernels are alive at
+    the same time.
+    :param executor: The executor to run the notebooks with.
+    :param notebook_paths: The paths of the notebooks to execute.
+    :param workers: The size of the kernel pool.
+    :return: The summaries of all the executions, in the order of the paths.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(executor.execute, notebook_paths))
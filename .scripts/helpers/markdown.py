@@ -23,6 +23,7 @@ from mdit_py_plugins.front_matter import front_matter_plugin
 from nbconvert import MarkdownExporter
 
 from .plugins.word_count import word_count_plugin
+from .search_index import SearchIndexBuilder
 
 MAIN_DIR = Path(__file__).parent.parent.parent
 
@@ -72,7 +73,11 @@ class NotebookToHugoMarkdownConverter:
     It additionally performs some formatting fixes to the generated markdown.
     """
 
-    def __init__(self):
+    def __init__(self, search_index: SearchIndexBuilder | None = None):
+        """
+        :param search_index: If set, every converted document is also added to this search index.
+        """
+        self._search_index = search_index
         self._exporter = MarkdownExporter()
         self._md = (
             MarkdownIt(
@@ -157,9 +162,44 @@ class NotebookToHugoMarkdownConverter:
             f.write(rendered_md)
         logger.info(f"Converted notebook to markdown: {output_path}")
 
+        # Index the document from the tokens that were already parsed for the conversion
+        if self._search_index is not None:
+            self._search_index.add_document(
+                self._document_url(output_path),
+                parsed_markdown.metadata.get("title"),
+                parsed_markdown.tokens,
+            )
+
         # Generate the _index.md file, if it doesn't exist, so the new markdown file is included in the menu
         self._write_index_file(output_path.parent)
 
+    def index_markdown_file(self, markdown_path: Path):
+        """
+        Add a previously converted markdown file to the search index, so the index also covers the documents that
+        are not converted again.
+        :param markdown_path: The path to the converted markdown file.
+        """
+        if self._search_index is None:
+            return
+
+        post = frontmatter.load(markdown_path)
+        self._search_index.add_document(
+            self._document_url(markdown_path),
+            post.metadata.get("title"),
+            self._md.parse(post.content),
+        )
+
+    def _document_url(self, output_path: Path) -> str:
+        """
+        Get the URL of a converted document on the website.
+        :param output_path: The path to the converted markdown file.
+        :return: The relative URL of the document.
+        """
+        relative_output_path = output_path.resolve().relative_to(MAIN_DIR.resolve())
+        # Relative web url does not contain the .dist/qdrant-landing/content prefix
+        relative_web_url = Path(*relative_output_path.parts[3:]).with_suffix("")
+        return f"/{relative_web_url}/"
+
     def _separate_code_blocks(self, markdown: ParsedMarkdown) -> ParsedMarkdown:
         """
         Separate code blocks in the markdown to ensure they are rendered correctly by Hugo.
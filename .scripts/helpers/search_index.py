@@ -0,0 +1,204 @@
+import gzip
+import json
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import markdown_it.token
+
+# Weights of the terms by the place they were found in
+TITLE_WEIGHT = 10
+HEADING_WEIGHT = 5
+CODE_WEIGHT = 2
+PROSE_WEIGHT = 1
+
+PROSE_TERM_PATTERN = re.compile(r"[a-z0-9]+(?:[-_][a-z0-9]+)*")
+CODE_IDENTIFIER_PATTERN = re.compile(
+    r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*"
+)
+
+STOP_WORDS = frozenset(
+    "a an and are as at be but by can do for from has have how if in into is it its of on or so such that the their "
+    "then there these this to was we were what when which will with you your".split()
+)
+
+# Python keywords and builtins are in almost every code block, so they are not worth indexing
+CODE_STOP_WORDS = frozenset(
+    "and as assert async await break class continue def del elif else except false finally for from global if import "
+    "in is lambda none nonlocal not or pass print raise return self true try while with yield len list dict str int "
+    "range".split()
+)
+
+
+def shard_key(term: str, prefix_length: int) -> str:
+    """
+    Get the name of the shard storing the postings of a term.
+    :param term: The indexed term.
+    :param prefix_length: The number of leading characters of the term that select the shard.
+    :return: The shard name, safe to use as a file name.
+    """
+    return re.sub(r"[^a-z0-9]", "_", term[:prefix_length])
+
+
+@dataclass
+class SearchDocument:
+    """
+    A document stored in the search index.
+    """
+
+    url: str
+    title: str | None
+    terms: Counter = field(default_factory=Counter)
+
+
+class SearchIndexBuilder:
+    """
+    Builds a static search index from the token streams of the converted documents. The postings of the terms are
+    sharded by the first characters of the term and stored as gzipped JSON files, so a search client only has to load
+    the shards of the terms it is looking for.
+    """
+
+    def __init__(self, min_term_length: int = 2, shard_prefix_length: int = 2):
+        self._min_term_length = min_term_length
+        self._shard_prefix_length = shard_prefix_length
+        self._documents: list[SearchDocument] = []
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add_document(
+        self, url: str, title: str | None, tokens: list[markdown_it.token.Token]
+    ):
+        """
+        Index a document from its parsed Markdown tokens.
+        :param url: The URL of the document on the website.
+        :param title: The title of the document.
+        :param tokens: The tokens of the document, as parsed by markdown-it.
+        """
+        document = SearchDocument(url, title)
+        if title:
+            self._add_prose_terms(document, title, TITLE_WEIGHT)
+
+        in_heading = False
+        for token in tokens:
+            if token.type == "heading_open":
+                in_heading = True
+            elif token.type == "heading_close":
+                in_heading = False
+            elif token.type == "fence" or token.type == "code_block":
+                self._add_code_terms(document, token.content)
+            elif token.type == "inline":
+                weight = HEADING_WEIGHT if in_heading else PROSE_WEIGHT
+                for child in token.children or []:
+                    if child.type == "text":
+                        self._add_prose_terms(document, child.content, weight)
+                    elif child.type == "code_inline":
+                        self._add_code_terms(document, child.content)
+
+        self._documents.append(document)
+
+    def _add_prose_terms(self, document: SearchDocument, text: str, weight: int):
+        for term in PROSE_TERM_PATTERN.findall(text.lower()):
+            if len(term) >= self._min_term_length and term not in STOP_WORDS:
+                document.terms[term] += weight
+
+    def _add_code_terms(self, document: SearchDocument, code: str):
+        """
+        Index the identifiers of a code snippet. Dotted names, like `models.VectorParams`, are indexed both as a whole
+        and by their parts.
+        """
+        for identifier in CODE_IDENTIFIER_PATTERN.findall(code):
+            parts = identifier.lower().split(".")
+            for term in {identifier.lower(), *parts}:
+                if len(term) >= self._min_term_length and term not in CODE_STOP_WORDS:
+                    document.terms[term] += CODE_WEIGHT
+
+    def write(self, output_dir: Path) -> dict:
+        """
+        Write the index to the output directory: a list of the documents, the gzipped shards of the postings and
+        a manifest listing the shards.
+        :param output_dir: The directory to write the index to. Existing shards are replaced.
+        :return: The manifest of the index.
+        """
+        postings: dict[str, dict[str, list]] = defaultdict(dict)
+        for doc_id, document in enumerate(self._documents):
+            for term, weight in document.terms.items():
+                postings[shard_key(term, self._shard_prefix_length)].setdefault(
+                    term, []
+                ).append([doc_id, weight])
+
+        shards_dir = output_dir / "shards"
+        shards_dir.mkdir(parents=True, exist_ok=True)
+        for old_shard in shards_dir.glob("*.json.gz"):
+            old_shard.unlink()
+
+        manifest = {
+            "version": 1,
+            "documents": len(self._documents),
+            "shard_prefix_length": self._shard_prefix_length,
+            "shards": {},
+        }
+        for shard_name, shard_postings in sorted(postings.items()):
+            # Document ids are delta-encoded, so the postings compress better
+            encoded = {}
+            for term, term_postings in sorted(shard_postings.items()):
+                previous_id = 0
+                encoded[term] = []
+                for doc_id, weight in term_postings:
+                    encoded[term].extend([doc_id - previous_id, weight])
+                    previous_id = doc_id
+            data = gzip.compress(
+                json.dumps(encoded, separators=(",", ":")).encode(), mtime=0
+            )
+            (shards_dir / f"{shard_name}.json.gz").write_bytes(data)
+            manifest["shards"][shard_name] = {
+                "terms": len(encoded),
+                "bytes": len(data),
+            }
+
+        with open(output_dir / "documents.json", "w") as f:
+            json.dump(
+                [{"url": d.url, "title": d.title} for d in self._documents],
+                f,
+                separators=(",", ":"),
+            )
+        with open(output_dir / "manifest.json", "w") as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+
+def search(index_dir: Path, query: str, limit: int = 10) -> list[dict]:
+    """
+    Search a written index the way a client of the static files would, loading only the shards of the query terms.
+    It is mostly useful to check the index.
+    :param index_dir: The directory the index was written to.
+    :param query: The query to search for.
+    :param limit: The maximum number of documents to return.
+    :return: The best matching documents, with their scores.
+    """
+    with open(index_dir / "manifest.json") as f:
+        manifest = json.load(f)
+    with open(index_dir / "documents.json") as f:
+        documents = json.load(f)
+
+    terms = set(PROSE_TERM_PATTERN.findall(query.lower())) - STOP_WORDS
+    shards = {}
+    scores = Counter()
+    for term in terms:
+        term_shard = shard_key(term, manifest["shard_prefix_length"])
+        if term_shard not in manifest["shards"]:
+            continue
+        if term_shard not in shards:
+            shard_path = index_dir / "shards" / f"{term_shard}.json.gz"
+            shards[term_shard] = json.loads(gzip.decompress(shard_path.read_bytes()))
+        encoded = shards[term_shard].get(term, [])
+        doc_id = 0
+        for delta, weight in zip(encoded[::2], encoded[1::2]):
+            doc_id += delta
+            scores[doc_id] += weight
+
+    return [
+        {**documents[doc_id], "score": score}
+        for doc_id, score in scores.most_common(limit)
+    ]
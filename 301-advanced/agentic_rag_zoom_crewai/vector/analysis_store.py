@@ -0,0 +1,62 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+# (meeting id, content hash, prompt version, model)
+AnalysisKey = Tuple[str, str, str, str]
+
+
+class AnalysisStore:
+    """
+    Persistent SQLite store of per-meeting analyses. Entries are keyed by the meeting id,
+    a hash of the analyzed content, the prompt version and the model, so an analysis is
+    reused only while all of them stay the same.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS meeting_analyses (
+                    meeting_id TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    analysis TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (meeting_id, content_hash, prompt_version, model)
+                )
+                """
+            )
+
+    def get_many(self, keys: Iterable[AnalysisKey]) -> Dict[AnalysisKey, str]:
+        """Return the stored analyses for the keys that are present."""
+        found = {}
+        with self._lock:
+            for key in keys:
+                row = self._connection.execute(
+                    """
+                    SELECT analysis FROM meeting_analyses
+                    WHERE meeting_id = ? AND content_hash = ?
+                        AND prompt_version = ? AND model = ?
+                    """,
+                    key,
+                ).fetchone()
+                if row is not None:
+                    found[key] = row[0]
+        return found
+
+    def put_many(self, analyses: Dict[AnalysisKey, str]):
+        """Store or replace the analyses."""
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO meeting_analyses VALUES (?, ?, ?, ?, ?, ?)",
+                [(*key, analysis, now) for key, analysis in analyses.items()],
+            )
@@ -0,0 +1,178 @@
+import asyncio
+import threading
+from typing import Any, Coroutine, Dict, List, Optional, Union
+
+from collection_profiles import (
+    COLLECTION_NAME,
+    QDRANT_SPAN_ATTRIBUTES,
+    SEARCH_PAYLOAD_FIELDS,
+    CollectionProfile,
+    get_collection_profile,
+)
+from embeddings import Embedder
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http import models
+from recency import recency_query
+from tracing import span
+
+
+def format_hit(hit: models.ScoredPoint) -> Dict[str, Any]:
+    """Convert a Qdrant hit into the dictionary returned by the search paths."""
+    return {
+        "id": str(hit.id),
+        "score": hit.score,
+        "topic": hit.payload.get("topic", "N/A"),
+        "start_time": hit.payload.get("start_time", "N/A"),
+        "duration": hit.payload.get("duration", "N/A"),
+        "summary": hit.payload.get("summary_overview", "N/A"),
+        "digest": hit.payload.get("digest", {}),
+        "user": hit.payload.get("user", {}),
+    }
+
+
+def meeting_query(
+    query_vector: List[float],
+    limit: int = 10,
+    score_threshold: Optional[float] = None,
+    query_filter: Optional[models.Filter] = None,
+    search_params: Optional[models.SearchParams] = None,
+    prefer_recent: bool = False,
+) -> models.QueryRequest:
+    """
+    The Qdrant query of a meeting search, shared by the sync and async search paths.
+    With `prefer_recent`, the hits are ranked by recency-boosted similarity.
+    """
+    if prefer_recent:
+        return models.QueryRequest(
+            with_payload=SEARCH_PAYLOAD_FIELDS,
+            **recency_query(
+                query_vector,
+                limit,
+                score_threshold=score_threshold,
+                query_filter=query_filter,
+                search_params=search_params,
+            ),
+        )
+    return models.QueryRequest(
+        query=query_vector,
+        limit=limit,
+        score_threshold=score_threshold,
+        filter=query_filter,
+        params=search_params,
+        with_payload=SEARCH_PAYLOAD_FIELDS,
+    )
+
+
+class AsyncMeetingSearch:
+    """
+    Asyncio-native meeting search. Query embeddings and Qdrant requests are awaited,
+    and several queries can be sent together through a single batch search request.
+    A sync `qdrant_client`, e.g. the in-process Qdrant, is queried in a worker thread.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        profile: Optional[CollectionProfile] = None,
+        score_threshold: float = 0.7,
+        embedder: Optional[Embedder] = None,
+        qdrant_client: Optional[Union[AsyncQdrantClient, QdrantClient]] = None,
+    ):
+        self.qdrant_client = qdrant_client or AsyncQdrantClient(
+            url=url, api_key=api_key
+        )
+        self.embedder = embedder or Embedder()
+        self.profile = profile or get_collection_profile()
+        self.score_threshold = score_threshold
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+    async def embed(self, queries: List[str]) -> List[List[float]]:
+        """
+        Embed all the queries in one batch with the model the meetings were embedded
+        with. The model runs in a worker thread, so the event loop is not blocked.
+        """
+        with span(
+            "embedding",
+            **{"embedding.model": self.embedder.model_name, "queries": len(queries)},
+        ):
+            vectors = await asyncio.to_thread(self.embedder.encode, queries)
+        return vectors.tolist()
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 10,
+        query_filter: Optional[models.Filter] = None,
+        prefer_recent: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Search the meetings matching a single query."""
+        return (await self.search_batch([query], limit, query_filter, prefer_recent))[0]
+
+    async def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 10,
+        query_filter: Optional[models.Filter] = None,
+        prefer_recent: bool = False,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search several queries at once. The queries are embedded in one request and sent
+        to Qdrant in one batch, so the latency is close to that of the slowest query.
+        """
+        if not queries:
+            return []
+        return await self.search_vectors(
+            await self.embed(queries), limit, query_filter, prefer_recent
+        )
+
+    async def search_vectors(
+        self,
+        query_vectors: List[List[float]],
+        limit: int = 10,
+        query_filter: Optional[models.Filter] = None,
+        prefer_recent: bool = False,
+    ) -> List[List[Dict[str, Any]]]:
+        """Search already embedded queries in one batch request."""
+        if not query_vectors:
+            return []
+        with span(
+            "qdrant.query_batch",
+            queries=len(query_vectors),
+            recency=prefer_recent,
+            **QDRANT_SPAN_ATTRIBUTES,
+        ):
+            requests = [
+                meeting_query(
+                    query_vector,
+                    limit,
+                    score_threshold=self.score_threshold,
+                    query_filter=query_filter,
+                    search_params=self.profile.search_params(),
+                    prefer_recent=prefer_recent,
+                )
+                for query_vector in query_vectors
+            ]
+            if isinstance(self.qdrant_client, QdrantClient):
+                responses = await asyncio.to_thread(
+                    self.qdrant_client.query_batch_points,
+                    collection_name=COLLECTION_NAME,
+                    requests=requests,
+                )
+            else:
+                responses = await self.qdrant_client.query_batch_points(
+                    collection_name=COLLECTION_NAME, requests=requests
+                )
+        return [[format_hit(hit) for hit in response.points] for response in responses]
+
+    def run(self, coroutine: Coroutine) -> Any:
+        """
+        Run a coroutine from synchronous code, e.g. a CrewAI tool. All the coroutines share
+        one background event loop, so the async clients keep their connection pools.
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
@@ -0,0 +1,402 @@
+import argparse
+import base64
+import json
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from async_search import meeting_query
+from collection_profiles import (
+    PROFILES,
+    VECTOR_SIZE,
+    CollectionProfile,
+    create_collection,
+    get_collection_profile,
+)
+from context_packing import pack_results
+from data_loader import (
+    PAYLOAD_INDEXES,
+    MeetingData,
+    build_meeting_filter,
+    meeting_point,
+    meeting_text,
+    search_collection,
+)
+from local_index import LocalVectorIndex
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+from resources import get_qdrant_client
+from upsert_writer import RetryQueue, UpsertWriter
+
+BENCHMARK_COLLECTION = "benchmark_meetings"
+RESULTS_DIR = Path(__file__).parent.parent / ".cache" / "benchmarks"
+
+TOPICS = [
+    "marketing strategy", "product launch", "quarterly planning", "sales pipeline",
+    "hiring", "engineering roadmap", "customer feedback", "budget review",
+    "security audit", "design review", "partnership", "onboarding",
+    "incident postmortem", "pricing", "data platform", "board update",
+]  # fmt: skip
+FIRST_NAMES = ["Ana", "Ben", "Chen", "Dara", "Eli", "Fatima", "Goran", "Hana"]
+FILLER = (
+    "we went through the numbers and agreed to follow up next week with the team "
+    "on the open questions and the next steps for the project"
+).split()
+
+
+def generate_meetings(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Generate `count` synthetic meetings shaped like the loaded Zoom recordings."""
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    meetings = []
+    for i in range(count):
+        topic = rng.choice(TOPICS)
+        name = rng.choice(FIRST_NAMES)
+        words = " ".join(rng.choice(FILLER) for _ in range(rng.randint(40, 200)))
+        meetings.append(
+            {
+                "id": i,
+                # Zoom meeting UUIDs are base64, and give the point IDs
+                "uuid": base64.urlsafe_b64encode(
+                    uuid.UUID(int=rng.getrandbits(128)).bytes
+                ).decode(),
+                "topic": f"{topic.title()} #{i}",
+                "topic_index": TOPICS.index(topic),
+                "start_time": (start + timedelta(hours=7 * i)).isoformat(),
+                "duration": rng.randint(5, 120),
+                "user": {
+                    "firstname": name,
+                    "lastname": "Doe",
+                    "email": f"{name.lower()}@example.com",
+                },
+                "summary": {"summary_overview": f"Discussion about {topic}: {words}"},
+                "vtt_content": f"{name} Doe: {words}",
+            }
+        )
+    return meetings
+
+
+def topic_centers(dim: int = VECTOR_SIZE, seed: int = 0) -> np.ndarray:
+    """One random unit direction per synthetic topic."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((len(TOPICS), dim)).astype(np.float32)
+    return centers / np.linalg.norm(centers, axis=1, keepdims=True)
+
+
+def synthetic_embedder(dim: int = VECTOR_SIZE, noise: float = 0.6, seed: int = 0):
+    """
+    Embed texts as noisy copies of their topic direction, so the corpus has the
+    clustered structure of real embeddings without loading a model.
+    """
+    rng = np.random.default_rng(seed + 1)
+    centers = topic_centers(dim, seed) * np.sqrt(dim)
+
+    def embed(topic_indexes: List[int]) -> np.ndarray:
+        vectors = centers[topic_indexes] + noise * rng.standard_normal(
+            (len(topic_indexes), dim)
+        ).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return embed
+
+
+def model_embedder():
+    """Embed texts with the embedding model used at ingestion."""
+    from resources import get_embedding_model
+
+    model = get_embedding_model()
+
+    def embed(texts: List[str]) -> np.ndarray:
+        vectors = np.asarray(model.encode(texts, batch_size=64), dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return embed
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Latency percentiles in milliseconds."""
+    values = np.asarray(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "mean_ms": round(float(values.mean()), 3),
+    }
+
+
+def _timed(call: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    call()
+    return time.perf_counter() - start
+
+
+def ingest(
+    client: QdrantClient,
+    profile: CollectionProfile,
+    meetings: List[Dict[str, Any]],
+    vectors: np.ndarray,
+    collection_name: str = BENCHMARK_COLLECTION,
+) -> Dict[str, float]:
+    """
+    Create a fresh collection and upload the corpus like `MeetingData` does: the points
+    of `meeting_point`, written by an `UpsertWriter`.
+    """
+    if client.collection_exists(collection_name):
+        client.delete_collection(collection_name)
+    create_collection(client, collection_name, profile)
+    for field_name, schema in PAYLOAD_INDEXES.items():
+        client.create_payload_index(collection_name, field_name, schema)
+
+    points = [
+        meeting_point(meeting, meeting["vtt_content"], vector.tolist())
+        for meeting, vector in zip(meetings, vectors)
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        # Failed batches are not queued for the app to replay
+        writer = UpsertWriter(
+            client,
+            collection_name,
+            retry_queue=RetryQueue(Path(directory) / "queue.jsonl"),
+        )
+        start = time.perf_counter()
+        stats = writer.write(points)
+        seconds = time.perf_counter() - start
+    return {
+        "seconds": round(seconds, 3),
+        "points_per_second": round(len(meetings) / seconds, 1),
+        "failed_points": stats["queued"],
+    }
+
+
+def _query_points(
+    client: QdrantClient,
+    query: np.ndarray,
+    k: int,
+    profile: CollectionProfile,
+    query_filter: Optional[models.Filter] = None,
+) -> List[models.ScoredPoint]:
+    """The request of the search paths, see `search_collection`, without a threshold."""
+    (response,) = client.query_batch_points(
+        collection_name=BENCHMARK_COLLECTION,
+        requests=[
+            meeting_query(
+                query.tolist(),
+                k,
+                query_filter=query_filter,
+                search_params=profile.search_params(),
+            )
+        ],
+    )
+    return response.points
+
+
+def run_size(
+    client: QdrantClient,
+    profile: CollectionProfile,
+    size: int,
+    query_count: int,
+    k: int,
+    embedder: str,
+    seed: int,
+) -> Dict[str, Any]:
+    """Benchmark ingestion, search latency, recall and the fallback for one corpus."""
+    meetings = generate_meetings(size, seed)
+    rng = random.Random(seed + 1)
+    query_topics = [rng.randrange(len(TOPICS)) for _ in range(query_count)]
+    if embedder == "model":
+        embed = model_embedder()
+        vectors = embed([meeting_text(m, m["vtt_content"]) for m in meetings])
+        queries = embed([TOPICS[t] for t in query_topics])
+    else:
+        embed = synthetic_embedder(seed=seed)
+        vectors = embed([m["topic_index"] for m in meetings])
+        queries = embed(query_topics)
+
+    print(f"LOG: Benchmarking {size} meetings with the '{profile.name}' profile")
+    result: Dict[str, Any] = {"size": size, "profile": profile.name}
+    result["ingest"] = ingest(client, profile, meetings, vectors)
+    point_ids = [meeting_point(m, "", []).id for m in meetings]
+
+    # Exact top-k by brute-force cosine similarity, the ground truth for recall
+    exact = np.argsort(-(queries @ vectors.T), axis=1)[:, :k]
+
+    latencies, recalls = [], []
+    for query, truth in zip(queries, exact):
+        start = time.perf_counter()
+        hits = _query_points(client, query, k, profile)
+        latencies.append(time.perf_counter() - start)
+        expected = {point_ids[i] for i in truth.tolist()}
+        recalls.append(len({str(hit.id) for hit in hits} & expected) / k)
+    result["search"] = percentiles(latencies)
+    result[f"recall_at_{k}"] = round(float(np.mean(recalls)), 4)
+
+    # Same searches restricted by the indexed payload fields
+    query_filter = build_meeting_filter(
+        start_after=meetings[size // 4]["start_time"], min_duration=30
+    )
+    result["filtered_search"] = percentiles(
+        [
+            _timed(
+                lambda query=query: _query_points(
+                    client, query, k, profile, query_filter
+                )
+            )
+            for query in queries
+        ]
+    )
+
+    # The search tool end to end: query embedding, the search and the result packing.
+    # Synthetic vectors do not match embedded query texts, so only with the model
+    if embedder == "model":
+        result["search_tool"] = percentiles(
+            [
+                _timed(
+                    lambda topic=topic: pack_results(
+                        search_collection(
+                            TOPICS[topic], k, collection_name=BENCHMARK_COLLECTION
+                        )
+                    )
+                )
+                for topic in query_topics
+            ]
+        )
+
+    # Exact search of the memory-mapped local index, used when Qdrant is unreachable
+    with tempfile.TemporaryDirectory() as directory:
+        local_index = LocalVectorIndex(Path(directory))
+        local_index.upsert(
+            SimpleNamespace(id=m["id"], vector=vector, payload=m)
+            for m, vector in zip(meetings, vectors)
+        )
+        result["local_index"] = percentiles(
+            [
+                _timed(lambda query=query: local_index.search(query, limit=k))
+                for query in queries
+            ]
+        )
+
+    # Content matching over the loaded meetings, the last resort of the fallbacks
+    fallback = SimpleNamespace(
+        meetings=meetings, get_transcript=lambda meeting: meeting["vtt_content"]
+    )
+    result["fallback"] = percentiles(
+        [
+            _timed(
+                lambda topic=topic: MeetingData._match_content(
+                    fallback, TOPICS[topic], k
+                )
+            )
+            for topic in query_topics[: max(1, query_count // 10)]
+        ]
+    )
+    return result
+
+
+def _change(old: float, new: float) -> str:
+    return f"{new / old - 1:+.1%}" if old else "n/a"
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]):
+    """Print the change of every metric against a baseline run."""
+    previous = {(r["size"], r["profile"]): r for r in baseline["results"]}
+    for result in current["results"]:
+        before = previous.get((result["size"], result["profile"]))
+        if before is None:
+            continue
+        print(f"{result['size']} meetings, '{result['profile']}' profile:")
+        for section in (
+            "search",
+            "filtered_search",
+            "search_tool",
+            "local_index",
+            "fallback",
+        ):
+            if section not in before or section not in result:
+                continue
+            old, new = before[section]["p95_ms"], result[section]["p95_ms"]
+            print(f"  {section} p95: {old} ms -> {new} ms ({_change(old, new)})")
+        old = before["ingest"]["points_per_second"]
+        new = result["ingest"]["points_per_second"]
+        print(f"  ingestion: {old} -> {new} points/s ({_change(old, new)})")
+        for key in result:
+            if key.startswith("recall_at_") and key in before:
+                print(f"  {key}: {before[key]} -> {result[key]}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark meeting ingestion and search on synthetic corpora"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument(
+        "--profiles", nargs="+", choices=list(PROFILES), default=["default"]
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument(
+        "--embedder",
+        choices=["synthetic", "model"],
+        default="synthetic",
+        help="Clustered random vectors, or the embedding model",
+    )
+    parser.add_argument(
+        "--url",
+        default=":memory:",
+        help="Qdrant URL. The in-memory local mode always searches exactly, so use a "
+        "server to measure HNSW and quantization recall",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path, help="Earlier results to compare to")
+    args = parser.parse_args(argv)
+
+    # The shared client, so the search tool path searches the same Qdrant
+    os.environ["QDRANT_URL"] = args.url
+    client = get_qdrant_client()
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "url": args.url,
+            "embedder": args.embedder,
+            "queries": args.queries,
+            "k": args.k,
+            "seed": args.seed,
+        },
+        "results": [
+            run_size(
+                client,
+                get_collection_profile(profile),
+                size,
+                args.queries,
+                args.k,
+                args.embedder,
+                args.seed,
+            )
+            for profile in args.profiles
+            for size in args.sizes
+        ],
+    }
+    if client.collection_exists(BENCHMARK_COLLECTION):
+        client.delete_collection(BENCHMARK_COLLECTION)
+
+    output = args.output or RESULTS_DIR / (
+        f"search-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(json.dumps(report["results"], indent=2))
+    print(f"LOG: Results written to {output}")
+
+    if args.baseline:
+        compare(json.loads(args.baseline.read_text()), report)
+
+
+if __name__ == "__main__":
+    main()
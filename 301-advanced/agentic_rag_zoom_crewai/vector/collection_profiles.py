@@ -0,0 +1,182 @@
+import argparse
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+COLLECTION_NAME = "zoom_recordings"
+
+# Attributes of the trace spans around requests to the collection
+QDRANT_SPAN_ATTRIBUTES = {"db.system": "qdrant", "db.collection.name": COLLECTION_NAME}
+
+# SentenceTransformer all-MiniLM-L6-v2 dimension
+VECTOR_SIZE = 384
+
+# Payload fields needed to present a search hit. Transcripts and full summaries stay
+# in the on-disk payload and are only fetched on demand.
+SEARCH_PAYLOAD_FIELDS = [
+    "topic",
+    "start_time",
+    "duration",
+    "summary_overview",
+    "digest",
+    "user",
+]
+
+
+@dataclass(frozen=True)
+class CollectionProfile:
+    """
+    Storage and search configuration of the meetings collection. Quantized profiles keep
+    the compressed vectors in RAM and the original float32 vectors on disk, and rescore
+    an oversampled candidate list with the originals at search time.
+    """
+
+    name: str
+    on_disk_vectors: bool = False
+    quantization: Optional[models.QuantizationConfig] = None
+    hnsw: models.HnswConfigDiff = field(default_factory=models.HnswConfigDiff)
+    oversampling: float = 1.0
+    rescore: bool = True
+    hnsw_ef: Optional[int] = None
+
+    def vectors_config(self, size: int = VECTOR_SIZE) -> models.VectorParams:
+        return models.VectorParams(
+            size=size,
+            distance=models.Distance.COSINE,
+            on_disk=self.on_disk_vectors,
+        )
+
+    def search_params(self) -> Optional[models.SearchParams]:
+        """Search parameters matching the profile, or None for the server defaults."""
+        if self.quantization is None and self.hnsw_ef is None:
+            return None
+        quantization = None
+        if self.quantization is not None:
+            quantization = models.QuantizationSearchParams(
+                rescore=self.rescore, oversampling=self.oversampling
+            )
+        return models.SearchParams(hnsw_ef=self.hnsw_ef, quantization=quantization)
+
+
+PROFILES: Dict[str, CollectionProfile] = {
+    # Plain float32 vectors in RAM, the original setup
+    "default": CollectionProfile(name="default"),
+    # int8 vectors in RAM (4x smaller), originals on disk for rescoring
+    "scalar": CollectionProfile(
+        name="scalar",
+        on_disk_vectors=True,
+        quantization=models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8, quantile=0.99, always_ram=True
+            )
+        ),
+        hnsw=models.HnswConfigDiff(m=16, ef_construct=100),
+        oversampling=2.0,
+    ),
+    # 1 bit per dimension in RAM (32x smaller). Recall suffers more on small
+    # embeddings like MiniLM, hence the higher oversampling.
+    "binary": CollectionProfile(
+        name="binary",
+        on_disk_vectors=True,
+        quantization=models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=True)
+        ),
+        hnsw=models.HnswConfigDiff(m=16, ef_construct=100),
+        oversampling=3.0,
+    ),
+}
+
+
+def get_collection_profile(name: Optional[str] = None) -> CollectionProfile:
+    """Return the profile selected by name or by the QDRANT_COLLECTION_PROFILE variable."""
+    name = name or os.getenv("QDRANT_COLLECTION_PROFILE", "default")
+    if name not in PROFILES:
+        raise ValueError(
+            f"Unknown collection profile {name!r}, use one of {list(PROFILES)}"
+        )
+    return PROFILES[name]
+
+
+def create_collection(
+    client: QdrantClient, collection_name: str, profile: CollectionProfile
+):
+    """Create a new collection configured with the given profile."""
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=profile.vectors_config(),
+        hnsw_config=profile.hnsw,
+        quantization_config=profile.quantization,
+        # Keep the payload (mostly summaries) on disk instead of in RAM
+        on_disk_payload=True,
+    )
+
+
+def migrate_collection(
+    client: QdrantClient,
+    collection_name: str,
+    profile: CollectionProfile,
+    wait: bool = True,
+    poll_interval: float = 1.0,
+    drop_transcripts: bool = False,
+):
+    """
+    Convert an existing collection to the given profile in place. Qdrant keeps serving
+    searches from the current segments while the optimizer rebuilds them, so there is
+    no downtime and no need to re-upload the points. With `drop_transcripts`,
+    transcripts stored in the payload by earlier versions are deleted, for hosts that
+    serve them from their transcript shards. This cannot be undone.
+    """
+    client.update_collection(
+        collection_name=collection_name,
+        vectors_config={"": models.VectorParamsDiff(on_disk=profile.on_disk_vectors)},
+        hnsw_config=profile.hnsw,
+        quantization_config=profile.quantization or models.Disabled.DISABLED,
+        # Only applies to segments written from now on, see the readme
+        collection_params=models.CollectionParamsDiff(on_disk_payload=True),
+    )
+    if drop_transcripts:
+        print(f"LOG: Deleting the payload transcripts of '{collection_name}'")
+        client.delete_payload(
+            collection_name=collection_name,
+            keys=["vtt_content"],
+            points=models.FilterSelector(filter=models.Filter()),
+            wait=False,
+        )
+    print(f"LOG: Migrating '{collection_name}' to the '{profile.name}' profile")
+
+    while wait:
+        info = client.get_collection(collection_name)
+        if info.status == models.CollectionStatus.GREEN:
+            print("LOG: Migration complete")
+            break
+        print(f"LOG: Collection status is {info.status.value}, waiting...")
+        time.sleep(poll_interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate the meetings collection")
+    parser.add_argument("profile", choices=list(PROFILES))
+    parser.add_argument("--no-wait", action="store_true")
+    parser.add_argument(
+        "--drop-transcripts",
+        action="store_true",
+        help="Delete the transcripts stored in the payload by earlier versions. "
+        "Only the transcript shards of the loading host keep them afterwards",
+    )
+    args = parser.parse_args()
+
+    # The shared client loads .env.local, like the app, so the configured cluster is
+    # migrated. Imported here, as resources imports this module
+    from resources import get_qdrant_client
+
+    migrate_collection(
+        get_qdrant_client(),
+        COLLECTION_NAME,
+        get_collection_profile(args.profile),
+        wait=not args.no_wait,
+        drop_transcripts=args.drop_transcripts,
+    )
@@ -0,0 +1,110 @@
+import functools
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from meeting_analysis import format_digest
+
+# Fields of a search hit the agents need to reason about a meeting
+DEFAULT_FIELDS = ["id", "score", "topic", "start_time", "duration", "summary", "digest"]
+
+# Fields truncated first when a hit does not fit into the remaining budget
+TRUNCATABLE_FIELDS = ["content", "summary", "digest"]
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken, or estimate them if it is not available."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut the text down to at most `max_tokens` tokens."""
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[: max_tokens * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens]) + "…"
+
+
+def _serialize(item: Dict[str, Any]) -> str:
+    return json.dumps(item, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def project(item: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """Keep only the selected, non-empty fields, rounding scores."""
+    projected = {}
+    for field in fields:
+        value = item.get(field)
+        if value in (None, "", "N/A", {}, []):
+            continue
+        if field == "score" and isinstance(value, float):
+            value = round(value, 3)
+        if field == "digest" and isinstance(value, dict):
+            value = format_digest(value)
+        projected[field] = value
+    return projected
+
+
+def pack_results(
+    results: List[Dict[str, Any]],
+    token_budget: int = 1500,
+    fields: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Turn tool results into a compact representation that fits into `token_budget`
+    tokens. Results are deduplicated, projected onto `fields` and added by relevance;
+    the first one that does not fit has its long text fields truncated, and the rest is
+    only counted as omitted.
+    """
+    fields = fields or DEFAULT_FIELDS
+    seen, unique = set(), []
+    for result in sorted(results, key=lambda r: r.get("score") or 0, reverse=True):
+        key = result.get("id") or (result.get("topic"), result.get("start_time"))
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(project(result, fields))
+
+    packed, used = [], 0
+    for i, item in enumerate(unique):
+        remaining = token_budget - used
+        tokens = count_tokens(_serialize(item))
+        if tokens > remaining:
+            item = _truncate_item(item, remaining)
+            tokens = count_tokens(_serialize(item)) if item else 0
+            if not item or tokens > remaining:
+                return {"results": packed, "omitted": len(unique) - i, "tokens": used}
+        packed.append(item)
+        used += tokens
+    return {"results": packed, "omitted": 0, "tokens": used}
+
+
+def _truncate_item(item: Dict[str, Any], budget: int) -> Optional[Dict[str, Any]]:
+    """Shrink the long text fields of an item so it fits the budget, if possible."""
+    item = dict(item)
+    for field in TRUNCATABLE_FIELDS:
+        if field not in item:
+            continue
+        if not isinstance(item[field], str):
+            item[field] = _serialize(item[field])
+        without_field = count_tokens(_serialize({**item, field: ""}))
+        item[field] = truncate_to_tokens(item[field], budget - without_field - 2)
+        if count_tokens(_serialize(item)) <= budget:
+            return item
+    return None
@@ -1,31 +1,45 @@
 import os
+import queue
 import sys
+import threading
+from dataclasses import dataclass
 from datetime import datetime
-from pathlib import Path
-from typing import Dict, List, Type
+from typing import Any, Callable, Dict, Iterator, List, Optional, Type
 
-import anthropic
-from crewai import Agent, Crew, Task
+from context_packing import pack_results, truncate_to_tokens
+from crewai import LLM, Agent, Crew, Task
 from crewai.tools import BaseTool
-from dotenv import load_dotenv
-from openai import OpenAI
+from crewai.utilities.events import LLMStreamChunkEvent, crewai_event_bus
+from data_loader import (
+    MeetingData,
+    asearch_collection_batch,
+    fetch_transcript,
+    register_ingest_listener,
+    search_collection,
+)
+from execution_profiles import ExecutionProfile, get_execution_profile
+from llm_clients import get_analysis_client
+from meeting_analysis import ANALYSIS_MODEL, MapReduceAnalyzer
 from pydantic import BaseModel, Field
-from qdrant_client import QdrantClient
-from sentence_transformers import SentenceTransformer
+from query_router import route_query
+from resources import (
+    get_analysis_store,
+    get_async_search,
+    get_response_cache,
+    health,
+    is_loaded,
+)
+from resources import warm_up as warm_up_resources
+from tracing import current_span, record_usage, span, traced
 
-# Load environment variables from .env.local
-env_path = Path(__file__).parent.parent / ".env.local"
-load_dotenv(env_path)
 
-# Set API keys from environment
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+def _invalidate_response_cache():
+    # Nothing is cached before the first query creates the cache
+    if is_loaded("response_cache"):
+        get_response_cache().invalidate()
 
-# Initialize clients
-qdrant_client = QdrantClient(
-    url=os.getenv("QDRANT_URL"), api_key=os.getenv("QDRANT_API_KEY")
-)
-openai_client = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+
+register_ingest_listener(_invalidate_response_cache)
 
 
 # Define tool input schemas
@@ -40,6 +54,38 @@ class SearchInput(BaseModel):
     """Input schema for search tool."""
 
     query: str = Field(..., description="The search query")
+    start_after: Optional[str] = Field(
+        None, description="Only meetings starting at or after this ISO date/time"
+    )
+    start_before: Optional[str] = Field(
+        None, description="Only meetings starting at or before this ISO date/time"
+    )
+    user_email: Optional[str] = Field(
+        None, description="Only meetings recorded by the user with this email"
+    )
+    min_duration: Optional[int] = Field(
+        None, description="Only meetings lasting at least this many minutes"
+    )
+    prefer_recent: bool = Field(
+        False,
+        description="Rank recent meetings higher, for questions about the latest meetings",
+    )
+
+
+class BatchSearchInput(BaseModel):
+    """Input schema for batch search tool."""
+
+    queries: List[str] = Field(..., description="The search queries to run together")
+    prefer_recent: bool = Field(
+        False,
+        description="Rank recent meetings higher, for questions about the latest meetings",
+    )
+
+
+class TranscriptInput(BaseModel):
+    """Input schema for transcript tool."""
+
+    meeting_id: str = Field(..., description="The id of a meeting returned by search")
 
 
 class AnalysisInput(BaseModel):
@@ -54,100 +100,296 @@ class CalculatorTool(BaseTool):
     description: str = "Perform basic mathematical calculations"
     args_schema: Type[BaseModel] = CalculatorInput
 
+    @traced("tool.calculator")
     def _run(self, a: int, b: int) -> dict:
         return {"addition": a + b, "multiplication": a * b}
 
 
 class SearchMeetingsTool(BaseTool):
     name: str = "search_meetings"
-    description: str = "Search through meeting recordings using vector similarity"
+    description: str = (
+        "Search through meeting recordings using vector similarity, optionally "
+        "filtered by date range, user email and minimum duration, and optionally "
+        "ranking recent meetings higher"
+    )
     args_schema: Type[BaseModel] = SearchInput
 
-    def _run(self, query: str) -> List[Dict]:
-        # Use OpenAI embeddings to match data_loader.py
-        response = openai_client.embeddings.create(
-            model="text-embedding-ada-002", input=query
+    # Number of hits retrieved, and size and fields of the packed results handed to
+    # the agent
+    limit: int = 10
+    token_budget: int = 1500
+    fields: Optional[List[str]] = None
+
+    @traced("tool.search_meetings")
+    def _run(
+        self,
+        query: str,
+        start_after: Optional[str] = None,
+        start_before: Optional[str] = None,
+        user_email: Optional[str] = None,
+        min_duration: Optional[int] = None,
+        prefer_recent: bool = False,
+    ) -> Dict:
+        # The same search as MeetingData.search_meetings, without loading the meetings
+        search_results = search_collection(
+            query,
+            self.limit,
+            prefer_recent=prefer_recent,
+            start_after=start_after,
+            start_before=start_before,
+            user_email=user_email,
+            min_duration=min_duration,
+        )
+        packed = pack_results(
+            search_results, token_budget=self.token_budget, fields=self.fields
+        )
+        current_span().set_attribute("tool.result_tokens", packed["tokens"])
+        return packed
+
+    async def _arun(
+        self,
+        query: str,
+        start_after: Optional[str] = None,
+        start_before: Optional[str] = None,
+        user_email: Optional[str] = None,
+        min_duration: Optional[int] = None,
+        prefer_recent: bool = False,
+    ) -> Dict:
+        (results,) = await asearch_collection_batch(
+            [query],
+            self.limit,
+            prefer_recent=prefer_recent,
+            start_after=start_after,
+            start_before=start_before,
+            user_email=user_email,
+            min_duration=min_duration,
         )
-        query_vector = response.data[0].embedding
+        return pack_results(results, token_budget=self.token_budget, fields=self.fields)
 
-        search_results = qdrant_client.search(
-            collection_name="zoom_recordings",
-            query_vector=query_vector,
-            limit=10,
-            score_threshold=0.7,
+
+class BatchSearchMeetingsTool(BaseTool):
+    name: str = "batch_search_meetings"
+    description: str = (
+        "Search meeting recordings for several queries at once. Prefer it over "
+        "repeated search_meetings calls when a question needs multiple searches"
+    )
+    args_schema: Type[BaseModel] = BatchSearchInput
+
+    # Hits retrieved per query, and size and fields of the packed results of all the
+    # queries together
+    limit: int = 10
+    token_budget: int = 3000
+    fields: Optional[List[str]] = None
+
+    @traced("tool.batch_search_meetings")
+    def _run(self, queries: List[str], prefer_recent: bool = False) -> Dict[str, Dict]:
+        results = get_async_search().run(
+            asearch_collection_batch(
+                queries, limit=self.limit, prefer_recent=prefer_recent
+            )
         )
+        query_budget = self.token_budget // max(len(queries), 1)
+        return {
+            query: pack_results(hits, token_budget=query_budget, fields=self.fields)
+            for query, hits in zip(queries, results)
+        }
 
-        return [
-            {
-                "score": hit.score,
-                "topic": hit.payload.get("topic", "N/A"),
-                "start_time": hit.payload.get("start_time", "N/A"),
-                "duration": hit.payload.get("duration", "N/A"),
-                "summary": hit.payload.get("summary", {}).get(
-                    "summary_overview", "N/A"
-                ),
-            }
-            for hit in search_results
-        ]
+
+class FetchTranscriptTool(BaseTool):
+    name: str = "fetch_transcript"
+    description: str = (
+        "Fetch the full transcript and summary of a single meeting by the id returned "
+        "from search_meetings. Use it only when the search summary is not enough."
+    )
+    args_schema: Type[BaseModel] = TranscriptInput
+
+    # Longer transcripts are truncated to keep the agent prompt bounded
+    token_budget: int = 4000
+
+    @traced("tool.fetch_transcript")
+    def _run(self, meeting_id: str) -> Dict:
+        meeting = fetch_transcript(meeting_id)
+        if not meeting:
+            return {"error": f"Meeting {meeting_id} not found"}
+        if "error" in meeting:
+            # Transcript unavailable, the summary is still worth returning
+            return meeting
+        return {
+            **meeting,
+            "content": truncate_to_tokens(meeting["content"], self.token_budget),
+        }
 
 
 class MeetingAnalysisTool(BaseTool):
     name: str = "analyze_meeting"
-    description: str = "Analyze meeting content using Claude"
+    description: str = (
+        "Analyze meeting content using Claude. Pass {'meetings': [...]} to analyze "
+        "several meetings at once"
+    )
     args_schema: Type[BaseModel] = AnalysisInput
 
-    def _run(self, meeting_data: dict) -> Dict:
-        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+    model: str = ANALYSIS_MODEL
+    max_tokens: int = 1000
+    batch_token_budget: int = 6000
+    max_concurrency: int = 4
+    # ANALYSIS_STORE=off analyzes every meeting set afresh with plain map-reduce
+    use_store: bool = os.getenv("ANALYSIS_STORE", "on") != "off"
 
+    @traced("tool.analyze_meeting")
+    def _run(self, meeting_data: dict) -> Dict:
         # Check if we received a list of meetings in the meetings key
         meetings = meeting_data.get("meetings", [])
         if not isinstance(meetings, list):
             meetings = [meeting_data]  # Convert single meeting to list
 
-        # Format all meetings for analysis
-        meetings_text = "\n\n".join(
-            [
-                f"""Meeting {i+1}:
-            Topic: {m.get('topic')}
-            Start Time: {m.get('start_time')}
-            Duration: {m.get('duration')} minutes
-            Summary: {m.get('summary')}"""
-                for i, m in enumerate(meetings)
-            ]
+        # Stored per-meeting analyses are reused, the rest is analyzed in parallel
+        # batches, and everything is synthesized into a single answer. Without the
+        # store, batch analyses are merged instead
+        analyzer = MapReduceAnalyzer(
+            get_analysis_client(),
+            model=self.model,
+            max_tokens=self.max_tokens,
+            batch_token_budget=self.batch_token_budget,
+            max_concurrency=self.max_concurrency,
+            store=get_analysis_store() if self.use_store else None,
         )
-
-        prompt = f"""
-        Please analyze these meetings:
-
-        {meetings_text}
-
-        Provide:
-        1. Key discussion points across all meetings
-        2. Main decisions or action items
-        3. Overall patterns and insights
-        4. Notable participants and their contributions
-        5. Recommendations for follow-up
-        """
-
-        message = client.messages.create(
-            model="claude-3-sonnet-20240229",
-            max_tokens=1000,
-            temperature=0,
-            messages=[{"role": "user", "content": prompt}],
+        result = analyzer.analyze(meetings)
+        current_span().set_attribute(
+            "analysis.reused_analyses", result.get("reused_analyses", 0)
         )
 
         return {
             "meetings_analyzed": len(meetings),
-            "analysis": message.content,
+            "batches": result["batches"],
+            "reused_analyses": result.get("reused_analyses", 0),
+            "analysis": result["analysis"],
             "timestamp": datetime.now().isoformat(),
         }
 
 
-def get_crew_response(query: str) -> str:
+@dataclass
+class CrewEvent:
+    """An event streamed while a query is answered."""
+
+    type: str  # "step", "task", "token", "answer" or "heartbeat"
+    content: str = ""
+    agent: Optional[str] = None
+
+
+# Token callbacks of the streaming LLMs, by LLM instance. The event bus is global, so
+# chunks are routed to the query whose crew owns the LLM that emitted them
+_token_sinks: Dict[int, Callable[[str], None]] = {}
+_token_sinks_lock = threading.Lock()
+
+
+@crewai_event_bus.on(LLMStreamChunkEvent)
+def _on_stream_chunk(source: Any, event: LLMStreamChunkEvent):
+    sink = _token_sinks.get(id(source))
+    if sink is not None and event.chunk:
+        sink(event.chunk)
+
+
+def format_step(step: Any) -> str:
+    """Render an agent step (tool call or final answer) as markdown."""
+    thought = (getattr(step, "thought", "") or "").strip()
+    lines = [thought] if thought else []
+    tool = getattr(step, "tool", None)
+    if tool:
+        lines.append(f"🔧 **{tool}** `{getattr(step, 'tool_input', '')}`")
+        result = str(getattr(step, "result", "") or "")
+        if result:
+            lines.append(f"> {truncate_to_tokens(result, 100)}")
+    elif getattr(step, "output", None):
+        lines.append(f"✅ {truncate_to_tokens(str(step.output), 100)}")
+    return "\n\n".join(lines)
+
+
+def _fast_response(query: str, profile: ExecutionProfile) -> Optional[str]:
+    # Repeated and near-duplicate questions are answered from the cache
+    cached_response = get_response_cache().get(query, scope=profile.cache_scope)
+    current_span().set_attribute("cache.hit", cached_response is not None)
+    if cached_response is not None:
+        return cached_response
+
+    # Arithmetic, statistical and lookup queries are answered without the crew
+    # Lookups go straight to the vector search, with its local index fallback
+    routed_response = route_query(
+        query, MeetingData, search_collection, search_limit=profile.search_limit
+    )
+    current_span().set_attribute("router.routed", routed_response is not None)
+    return routed_response
+
+
+def _trace_step(step: Any):
+    """Record an agent step (tool call or final answer) as a span."""
+    tool = getattr(step, "tool", None)
+    with span(
+        "agent.step", **{"agent.action": "tool" if tool else "finish"}
+    ) as step_span:
+        if tool:
+            step_span.set_attribute("agent.tool", tool)
+
+
+def _answer(
+    query: str,
+    profile: ExecutionProfile,
+    step_callback: Callable[[Any], None] = _trace_step,
+    task_callback: Optional[Callable[[Any], None]] = None,
+    token_callback: Optional[Callable[[str], None]] = None,
+) -> Any:
+    """Answer a query from the cache, the router or the crew, as one trace."""
+    with span("crew.query", query=query, profile=profile.name) as query_span:
+        fast_response = _fast_response(query, profile)
+        if fast_response is not None:
+            return fast_response
+
+        synthesizer_llm = None
+        if token_callback is not None:
+            synthesizer_llm = LLM(
+                model=os.getenv("OPENAI_MODEL_NAME", "gpt-4o-mini"), stream=True
+            )
+            with _token_sinks_lock:
+                _token_sinks[id(synthesizer_llm)] = token_callback
+        try:
+            result = _build_crew(
+                query, profile, step_callback, task_callback, synthesizer_llm
+            ).kickoff()
+        finally:
+            if synthesizer_llm is not None:
+                with _token_sinks_lock:
+                    _token_sinks.pop(id(synthesizer_llm), None)
+        usage = getattr(result, "token_usage", None)
+        if usage is not None:
+            record_usage(query_span, usage.prompt_tokens, usage.completion_tokens)
+        get_response_cache().put(query, result, scope=profile.cache_scope)
+        return result
+
+
+def _build_crew(
+    query: str,
+    profile: ExecutionProfile,
+    step_callback: Optional[Callable[[Any], None]] = None,
+    task_callback: Optional[Callable[[Any], None]] = None,
+    synthesizer_llm: Optional[LLM] = None,
+) -> Crew:
     # Create tool instances
     calculator = CalculatorTool()
-    searcher = SearchMeetingsTool()
-    analyzer = MeetingAnalysisTool()
+    searcher = SearchMeetingsTool(
+        limit=profile.search_limit,
+        token_budget=profile.search_token_budget,
+        fields=list(profile.search_fields),
+    )
+    batch_searcher = BatchSearchMeetingsTool(
+        limit=profile.search_limit,
+        token_budget=2 * profile.search_token_budget,
+        fields=list(profile.search_fields),
+    )
+    transcripts = FetchTranscriptTool(token_budget=profile.transcript_token_budget)
+    analyzer = MeetingAnalysisTool(
+        model=profile.analysis_model,
+        max_tokens=profile.analysis_max_tokens,
+        batch_token_budget=profile.analysis_batch_token_budget,
+    )
 
     # Create agents
     researcher = Agent(
@@ -156,7 +398,7 @@ def get_crew_response(query: str) -> str:
         backstory="""You are an expert at finding and analyzing information.
                   You know when to use calculations, when to search meetings,
                   and when to perform detailed analysis.""",
-        tools=[calculator, searcher, analyzer],
+        tools=[calculator, searcher, batch_searcher, transcripts, analyzer],
         verbose=True,
     )
 
@@ -165,6 +407,7 @@ def get_crew_response(query: str) -> str:
         goal="Create comprehensive and clear responses",
         backstory="""You excel at taking raw information and analysis
                   and creating clear, actionable insights.""",
+        llm=synthesizer_llm,
         verbose=True,
     )
 
@@ -172,8 +415,12 @@ def get_crew_response(query: str) -> str:
     research_task = Task(
         description=f"""Process this query: '{query}'
                     1. If it involves calculations, use the calculator tool
-                    2. If it needs meeting information, use the search tool
+                    2. If it needs meeting information, use the search tool, passing
+                       date range, user or duration constraints as search filters.
+                       If several searches are needed, run them together with the
+                       batch search tool
                     3. For detailed analysis, use both search and analysis tools
+                    4. Only fetch a full transcript when the summary is not enough
                     Explain your tool selection and process.""",
         expected_output="""A dictionary containing:
                        - The tools used
@@ -193,15 +440,88 @@ def get_crew_response(query: str) -> str:
         agent=synthesizer,
     )
 
-    # Create and run crew
-    crew = Crew(
+    return Crew(
         agents=[researcher, synthesizer],
         tasks=[research_task, synthesis_task],
         verbose=True,
+        step_callback=step_callback,
+        task_callback=task_callback,
     )
 
-    result = crew.kickoff()
-    return result
+
+def get_crew_response(query: str, profile: Optional[ExecutionProfile] = None) -> str:
+    return _answer(query, profile or get_execution_profile())
+
+
+def stream_crew_response(
+    query: str,
+    profile: Optional[ExecutionProfile] = None,
+    heartbeat: Optional[float] = None,
+) -> Iterator[CrewEvent]:
+    """
+    Answer a query as a stream of events: agent steps and task outputs while the crew
+    works, the tokens of the synthesizer as its LLM generates the answer, then the
+    answer. The query runs in a background thread; with `heartbeat`,
+    a "heartbeat" event is yielded every `heartbeat` seconds without other events, so
+    the caller can refresh its display.
+    """
+    profile = profile or get_execution_profile()
+    events: "queue.Queue[Any]" = queue.Queue()
+    done = object()
+
+    def on_step(step: Any):
+        _trace_step(step)
+        content = format_step(step)
+        if content:
+            events.put(CrewEvent("step", content))
+
+    def on_task(output: Any):
+        events.put(CrewEvent("task", str(output.raw), getattr(output, "agent", None)))
+
+    def on_token(chunk: str):
+        events.put(CrewEvent("token", chunk, "Information Synthesizer"))
+
+    def run():
+        try:
+            result = _answer(query, profile, on_step, on_task, on_token)
+            events.put(CrewEvent("answer", str(result)))
+        except Exception as e:
+            events.put(e)
+        finally:
+            events.put(done)
+
+    threading.Thread(target=run, daemon=True).start()
+    while True:
+        try:
+            event = events.get(timeout=heartbeat)
+        except queue.Empty:
+            yield CrewEvent("heartbeat")
+            continue
+        if event is done:
+            return
+        if isinstance(event, Exception):
+            raise event
+        yield event
+
+
+def warm_up(load_meetings: bool = True):
+    """Load the shared models and clients, and the meeting data, before any query."""
+    warm_up_resources()
+    if load_meetings:
+        MeetingData()
+
+
+def health_report() -> Dict[str, Dict[str, Any]]:
+    """Health of the shared resources and of the loaded meeting data."""
+    meeting_data = MeetingData._instance
+    loaded = meeting_data is not None and meeting_data._initialized
+    return {
+        **health(),
+        "meeting_data": {
+            "loaded": loaded,
+            "meetings": len(meeting_data.meetings) if loaded else None,
+        },
+    }
 
 
 if __name__ == "__main__":
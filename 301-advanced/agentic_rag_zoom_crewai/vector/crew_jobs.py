@@ -0,0 +1,66 @@
+import threading
+import time
+from typing import List, Optional
+
+from crew import CrewEvent, stream_crew_response
+from execution_profiles import ExecutionProfile
+
+# The synthesizer writes its reasoning before this marker and the answer after it
+_FINAL_ANSWER_MARKER = "Final Answer:"
+
+
+class CrewJob:
+    """
+    A query answered in a background thread. The job collects the events streamed by
+    the crew, so a UI can poll its progress without blocking on the answer and without
+    restarting the work when it re-renders.
+    """
+
+    def __init__(self, query: str, profile: Optional[ExecutionProfile] = None):
+        self.query = query
+        self.profile = profile
+        self.answer: Optional[str] = None
+        self.error: Optional[str] = None
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._events: List[CrewEvent] = []
+        self._tokens: List[str] = []
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            for event in stream_crew_response(self.query, self.profile):
+                with self._lock:
+                    if event.type == "answer":
+                        self.answer = event.content
+                    elif event.type == "token":
+                        self._tokens.append(event.content)
+                    else:
+                        self._events.append(event)
+        except Exception as e:
+            print(f"LOG: Crew job failed: {e}")
+            self.error = str(e)
+        finally:
+            self.finished_at = time.time()
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
+
+    def partial_answer(self) -> str:
+        """The text of the answer generated so far, without the synthesizer's reasoning."""
+        with self._lock:
+            text = "".join(self._tokens)
+        _, marker, answer = text.rpartition(_FINAL_ANSWER_MARKER)
+        return answer.strip() if marker else ""
+
+    def events(self) -> List[CrewEvent]:
+        """The progress events received so far, other than the answer tokens."""
+        with self._lock:
+            return list(self._events)
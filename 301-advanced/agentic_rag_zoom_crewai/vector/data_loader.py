@@ -1,22 +1,592 @@
+import asyncio
 import base64
+import functools
 import json
+import math
+import mmap
 import os
+import re
+import threading
 import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List
-
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from async_search import format_hit, meeting_query
+from collection_profiles import (
+    COLLECTION_NAME,
+    QDRANT_SPAN_ATTRIBUTES,
+    create_collection,
+)
+from context_packing import project
+from digests import DigestPipeline
 from dotenv import load_dotenv
-from openai import OpenAI
-from qdrant_client import QdrantClient
+from embeddings import EMBEDDING_MODEL_NAME
 from qdrant_client.http import models
-from sentence_transformers import SentenceTransformer
+from recency import recency_half_life_days, recency_prefetch_factor, recency_weight
+from resources import (
+    get_async_search,
+    get_embedding_model,
+    get_local_index,
+    get_profile,
+    get_qdrant_client,
+    qdrant_settings,
+)
+from tracing import span
+from upsert_writer import UpsertWriter
 
 # Load environment variables
 env_path = Path(__file__).parent.parent / ".env.local"
 load_dotenv(env_path)
 
 # Set OpenAI key explicitly in environment with correct name
-os.environ["OPENAI_API_KEY"] = os.getenv("openai_api_key")
+if os.getenv("openai_api_key"):
+    os.environ["OPENAI_API_KEY"] = os.getenv("openai_api_key")
+
+# Meeting fields returned for statistical queries, and the words that make a query one
+STATISTIC_FIELDS = ["topic", "start_time", "duration", "user"]
+STATISTICAL_QUERY = re.compile(
+    r"\b(average|mean|total|count|statistics)\b", re.IGNORECASE
+)
+
+# Typed payload indexes, so metadata filters are applied during HNSW traversal
+PAYLOAD_INDEXES = {
+    "start_time": models.PayloadSchemaType.DATETIME,
+    "duration": models.PayloadSchemaType.INTEGER,
+    "user.email": models.PayloadSchemaType.KEYWORD,
+}
+
+# Transcripts are spilled to offset-indexed shards here, so only metadata stays in memory
+TRANSCRIPT_CACHE_DIR = Path(__file__).parent.parent / ".cache" / "transcripts"
+
+# Pool used to parse the data files: "thread" (default) or "process"
+LOADER_POOL = os.getenv("MEETINGS_LOADER_POOL", "thread")
+LOADER_WORKERS = int(os.getenv("MEETINGS_LOADER_WORKERS", min(8, os.cpu_count() or 1)))
+
+# Callbacks run after new meetings are ingested, e.g. to invalidate response caches
+_ingest_listeners: List[Callable[[], None]] = []
+
+
+def register_ingest_listener(callback: Callable[[], None]):
+    """Register a callback to be run whenever new meetings are ingested."""
+    _ingest_listeners.append(callback)
+
+
+def build_meeting_filter(
+    start_after: Optional[str] = None,
+    start_before: Optional[str] = None,
+    user_email: Optional[str] = None,
+    min_duration: Optional[int] = None,
+) -> Optional[models.Filter]:
+    """Translate structured meeting filters into a Qdrant filter, or None if unset."""
+    conditions = []
+    if start_after or start_before:
+        conditions.append(
+            models.FieldCondition(
+                key="start_time",
+                range=models.DatetimeRange(gte=start_after, lte=start_before),
+            )
+        )
+    if user_email:
+        conditions.append(
+            models.FieldCondition(
+                key="user.email", match=models.MatchValue(value=user_email)
+            )
+        )
+    if min_duration is not None:
+        conditions.append(
+            models.FieldCondition(key="duration", range=models.Range(gte=min_duration))
+        )
+    return models.Filter(must=conditions) if conditions else None
+
+
+def search_local_index(
+    query_vector: List[float],
+    limit: int = 10,
+    score_threshold: Optional[float] = 0.7,
+    prefer_recent: bool = False,
+    **filters,
+) -> List[models.ScoredPoint]:
+    """
+    Exact search of the local copy of the collection, for when Qdrant is unreachable.
+    Takes the same `filters` as `build_meeting_filter`, and ranks like Qdrant does if
+    `prefer_recent` is set.
+    """
+    with span("local_index.search") as search_span:
+        hits = get_local_index().search(
+            query_vector,
+            limit=limit * recency_prefetch_factor() if prefer_recent else limit,
+            score_threshold=score_threshold,
+            predicate=(lambda payload: _matches_filters(payload, **filters))
+            if any(value is not None for value in filters.values())
+            else None,
+        )
+        if prefer_recent:
+            hits = rescore_by_recency(hits, limit)
+        search_span.set_attribute("local_index.hits", len(hits))
+    print(f"LOG: Found {len(hits)} matches in the local vector index")
+    return hits
+
+
+def search_collection(
+    query: str,
+    limit: int = 10,
+    prefer_recent: bool = False,
+    collection_name: str = COLLECTION_NAME,
+    **filters,
+) -> List[Dict[str, Any]]:
+    """
+    Vector search of the meetings collection, shared by the synchronous search paths;
+    `AsyncMeetingSearch` sends the same query. If Qdrant is unreachable, the local vector
+    index answers instead. Takes the same `filters` as `build_meeting_filter`; another
+    `collection_name` is only searched by the benchmarks.
+    """
+    # Queries are embedded with the model used for the meetings
+    print("LOG: Embedding query")
+    with span("embedding", **{"embedding.model": EMBEDDING_MODEL_NAME}):
+        query_vector = get_embedding_model().encode(query).tolist()
+
+    try:
+        print("LOG: Searching Qdrant")
+        with span(
+            "qdrant.query", recency=prefer_recent, **QDRANT_SPAN_ATTRIBUTES
+        ) as search_span:
+            (response,) = get_qdrant_client().query_batch_points(
+                collection_name=collection_name,
+                requests=[
+                    meeting_query(
+                        query_vector,
+                        limit,
+                        score_threshold=0.7,  # Only return good matches
+                        query_filter=build_meeting_filter(**filters),
+                        search_params=get_profile().search_params(),
+                        prefer_recent=prefer_recent,
+                    )
+                ],
+            )
+            search_span.set_attribute("qdrant.hits", len(response.points))
+        hits = response.points
+        print(f"LOG: Found {len(hits)} matches in Qdrant")
+    except Exception as e:
+        # Degraded mode: exact search of the local copy of the collection
+        print(f"LOG: Qdrant search failed, using the local vector index: {e}")
+        hits = search_local_index(
+            query_vector, limit, prefer_recent=prefer_recent, **filters
+        )
+    return [format_hit(hit) for hit in hits]
+
+
+async def asearch_collection_batch(
+    queries: List[str], limit: int = 10, prefer_recent: bool = False, **filters
+) -> List[List[Dict[str, Any]]]:
+    """
+    Asyncio counterpart of `search_collection` for several queries, sent to Qdrant in
+    a single batch request by `AsyncMeetingSearch`. If Qdrant is unreachable, the local
+    vector index answers every query instead.
+    """
+    async_search = get_async_search()
+    query_vectors = await async_search.embed(queries)
+    try:
+        return await async_search.search_vectors(
+            query_vectors,
+            limit,
+            query_filter=build_meeting_filter(**filters),
+            prefer_recent=prefer_recent,
+        )
+    except Exception as e:
+        print(f"LOG: Qdrant batch search failed, using the local vector index: {e}")
+
+    def search_locally() -> List[List[Dict[str, Any]]]:
+        return [
+            [
+                format_hit(hit)
+                for hit in search_local_index(
+                    query_vector, limit, prefer_recent=prefer_recent, **filters
+                )
+            ]
+            for query_vector in query_vectors
+        ]
+
+    return await asyncio.to_thread(search_locally)
+
+
+def _parse_datetime(value: str) -> datetime:
+    """Parse an ISO date/time, treating naive values as UTC like Qdrant does."""
+    # Zoom exports end in "Z", which fromisoformat only accepts from Python 3.11 on
+    if isinstance(value, str) and value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def rescore_by_recency(
+    hits: List[models.ScoredPoint],
+    limit: int,
+    now: Optional[datetime] = None,
+    half_life_days: Optional[float] = None,
+    weight: Optional[float] = None,
+) -> List[models.ScoredPoint]:
+    """Local counterpart of `recency.recency_formula`, for the local vector index."""
+    now = now or datetime.now(timezone.utc)
+    half_life_days = half_life_days or recency_half_life_days()
+    weight = recency_weight() if weight is None else weight
+    rescored = []
+    for hit in hits:
+        try:
+            start_time = _parse_datetime(hit.payload.get("start_time"))
+            age_days = abs((now - start_time).total_seconds()) / 86400
+            boost = weight * math.pow(0.5, age_days / half_life_days)
+        except (TypeError, ValueError):
+            boost = 0.0
+        rescored.append(hit.model_copy(update={"score": hit.score + boost}))
+    rescored.sort(key=lambda hit: hit.score, reverse=True)
+    return rescored[:limit]
+
+
+def _matches_filters(
+    meeting: Dict[str, Any],
+    start_after: Optional[str] = None,
+    start_before: Optional[str] = None,
+    user_email: Optional[str] = None,
+    min_duration: Optional[int] = None,
+) -> bool:
+    """Local counterpart of `build_meeting_filter` for the in-memory metadata."""
+    if start_after or start_before:
+        try:
+            start_time = _parse_datetime(meeting.get("start_time"))
+            if start_after and start_time < _parse_datetime(start_after):
+                return False
+            if start_before and start_time > _parse_datetime(start_before):
+                return False
+        except (TypeError, ValueError):
+            return False
+    if user_email and (meeting.get("user") or {}).get("email") != user_email:
+        return False
+    if min_duration is not None and (meeting.get("duration") or 0) < min_duration:
+        return False
+    return True
+
+
+class _JsonObjectStream:
+    """Incrementally decode a top-level JSON object, streaming the items of its arrays."""
+
+    def __init__(self, fp, chunk_size: int = 1 << 16):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Read the next chunk, dropping the already consumed part of the buffer."""
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def _consume(self, expected: str) -> str:
+        char = self._peek()
+        if char not in expected:
+            raise ValueError(f"Expected one of {expected!r}, got {char!r}")
+        self.pos += 1
+        return char
+
+    def _decode(self) -> Any:
+        """Decode a single value, reading more data until it is complete."""
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A value ending exactly at the buffer boundary may be truncated (e.g. a number)
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def items(self, streamed_key: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Yield (key, value) pairs of the top-level object. Elements of the array stored
+        under `streamed_key` are yielded one by one, each paired with that key.
+        """
+        self._consume("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self._decode()
+            self._consume(":")
+            if key == streamed_key and self._peek() == "[":
+                self._consume("[")
+                if self._peek() == "]":
+                    self._consume("]")
+                else:
+                    while True:
+                        yield key, self._decode()
+                        if self._consume(",]") == "]":
+                            break
+            else:
+                yield key, self._decode()
+            if self._consume(",}") == "}":
+                return
+
+
+def _parse_meetings_file(file_path: Path, cache_dir: Path) -> List[Dict[str, Any]]:
+    """
+    Stream the recordings of a single data file, spilling each transcript to an
+    offset-indexed shard in `cache_dir`. Only the metadata of the recordings is returned,
+    so the function is cheap to run in a thread or process pool.
+    """
+    stat = file_path.stat()
+    index_path = cache_dir / f"{file_path.stem}.json"
+    shard_path = cache_dir / f"{file_path.stem}.bin"
+
+    # Reuse the shard if the data file has not changed since it was written
+    if index_path.exists() and shard_path.exists():
+        with open(index_path, "r") as f:
+            index = json.load(f)
+        if (
+            index.get("source_mtime_ns") == stat.st_mtime_ns
+            and index.get("source_size") == stat.st_size
+        ):
+            return index["recordings"]
+
+    recordings = []
+    user = {}
+    offset = 0
+    with open(file_path, "r", encoding="utf-8") as f, open(shard_path, "wb") as shard:
+        for key, value in _JsonObjectStream(f).items("recordings"):
+            if key != "recordings":
+                user[key] = value
+                continue
+
+            transcript = (value.pop("vtt_content", None) or "").encode("utf-8")
+            shard.write(transcript)
+            value["_transcript"] = {
+                "shard": file_path.stem,
+                "offset": offset,
+                "length": len(transcript),
+            }
+            offset += len(transcript)
+            recordings.append(value)
+
+    # User info may come after the recordings in the file, so it is attached at the end
+    for recording in recordings:
+        recording["user"] = {
+            "firstname": user.get("firstname"),
+            "lastname": user.get("lastname"),
+            "email": user.get("email"),
+        }
+
+    with open(index_path, "w") as f:
+        json.dump(
+            {
+                "source_mtime_ns": stat.st_mtime_ns,
+                "source_size": stat.st_size,
+                "recordings": recordings,
+            },
+            f,
+        )
+    return recordings
+
+
+def _base64_to_uuid(base64_string: str) -> str:
+    """Convert base64 string to UUID."""
+    try:
+        base64_string = base64_string.rstrip("=")
+        byte_string = base64.urlsafe_b64decode(
+            base64_string + "==" * (-len(base64_string) % 4)
+        )
+        return str(uuid.UUID(bytes=byte_string[:16]))
+    except Exception:
+        return str(uuid.uuid4())
+
+
+def meeting_text(meeting: Dict[str, Any], transcript: str) -> str:
+    """The text embedded for a meeting."""
+    return f"""
+                Topic: {meeting.get('topic', '')}
+                Content: {transcript}
+                Summary: {json.dumps(meeting.get('summary', {}))}
+                """
+
+
+def meeting_point(
+    meeting: Dict[str, Any], transcript: str, vector: List[float]
+) -> models.PointStruct:
+    """
+    The Qdrant point of a meeting, with the point ID derived from its UUID. The
+    transcript is only embedded: it is served from the transcript shards, see
+    `TranscriptStore.read_point`, so the payload stays small.
+    """
+    return models.PointStruct(
+        id=_base64_to_uuid(meeting.get("uuid", str(uuid.uuid4()))),
+        vector=vector,
+        payload={
+            "topic": meeting.get("topic"),
+            "start_time": meeting.get("start_time"),
+            "duration": meeting.get("duration"),
+            "summary_overview": (meeting.get("summary") or {}).get("summary_overview"),
+            "summary": meeting.get("summary"),
+            "user": meeting.get("user"),
+        },
+    )
+
+
+def load_meetings(
+    data_dir: Path, cache_dir: Path = TRANSCRIPT_CACHE_DIR
+) -> List[Dict[str, Any]]:
+    """
+    Load the metadata of all meetings in the data files of `data_dir`. Files are parsed
+    in parallel and their transcripts are spilled to shards in `cache_dir`.
+    """
+    all_meetings = []
+    file_paths = sorted(data_dir.glob("*.txt"))
+    if not file_paths:
+        print(f"LOG: No data files found in {data_dir}")
+        return all_meetings
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    executor_cls = (
+        ProcessPoolExecutor if LOADER_POOL == "process" else ThreadPoolExecutor
+    )
+    workers = max(1, min(LOADER_WORKERS, len(file_paths)))
+    print(f"LOG: Loading {len(file_paths)} files with {workers} {LOADER_POOL} workers")
+
+    with executor_cls(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_parse_meetings_file, file_path, cache_dir)
+            for file_path in file_paths
+        ]
+        for file_path, future in zip(file_paths, futures):
+            try:
+                all_meetings.extend(future.result())
+                print(f"LOG: Loaded data from {file_path}")
+            except Exception as e:
+                print(f"LOG: Error loading file {file_path}: {e}")
+
+    print(f"LOG: Loaded {len(all_meetings)} meetings total")
+    return all_meetings
+
+
+class TranscriptStore:
+    """Read transcripts lazily from the memory-mapped shards written by the loader."""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._point_refs: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    def _get_map(self, shard: str) -> mmap.mmap:
+        with self._lock:
+            if shard not in self._maps:
+                with open(self.cache_dir / f"{shard}.bin", "rb") as f:
+                    self._maps[shard] = mmap.mmap(
+                        f.fileno(), 0, access=mmap.ACCESS_READ
+                    )
+            return self._maps[shard]
+
+    def read(self, ref: Dict[str, Any]) -> str:
+        """Return the transcript pointed to by a `_transcript` reference."""
+        if not ref or ref["length"] == 0:
+            return ""
+        mapped = self._get_map(ref["shard"])
+        return mapped[ref["offset"] : ref["offset"] + ref["length"]].decode("utf-8")
+
+    def _load_point_refs(self) -> Dict[str, Dict[str, Any]]:
+        """Map the point IDs of the meetings to their references in the shard indexes."""
+        refs = {}
+        for index_path in sorted(self.cache_dir.glob("*.json")):
+            try:
+                with open(index_path, "r") as f:
+                    recordings = json.load(f)["recordings"]
+            except (OSError, ValueError, KeyError):
+                continue
+            for recording in recordings:
+                if recording.get("uuid"):
+                    refs[_base64_to_uuid(recording["uuid"])] = recording["_transcript"]
+        return refs
+
+    def read_point(self, point_id: str) -> Optional[str]:
+        """
+        Return the transcript of the meeting stored as the Qdrant point `point_id`, or
+        None if it is not in the cache, e.g. when the cache was deleted or the meetings
+        were loaded on another host. The indexes are read again on a miss, in case the
+        loader wrote new shards since.
+        """
+        with self._lock:
+            if self._point_refs is None or point_id not in self._point_refs:
+                self._point_refs = self._load_point_refs()
+            ref = self._point_refs.get(point_id)
+        if ref is None:
+            return None
+        try:
+            return self.read(ref)
+        except OSError as e:
+            print(f"LOG: Transcript shard of point {point_id} is missing: {e}")
+            return None
+
+
+@functools.lru_cache(maxsize=1)
+def get_transcript_store() -> TranscriptStore:
+    """The transcript store shared by the loader and the crew tools."""
+    return TranscriptStore(TRANSCRIPT_CACHE_DIR)
+
+
+def fetch_transcript(meeting_id: str) -> Dict[str, Any]:
+    """
+    Fetch the summary of a single meeting from Qdrant and its full transcript from the
+    transcript store. Collections ingested while transcripts were still stored in the
+    payload keep serving them from there. Empty if the meeting does not exist, and with
+    an `error` instead of the `content` if its transcript is not available on this host.
+    """
+    print(f"LOG: Fetching transcript for meeting {meeting_id}")
+    with span("qdrant.retrieve", **QDRANT_SPAN_ATTRIBUTES):
+        points = get_qdrant_client().retrieve(
+            collection_name=COLLECTION_NAME,
+            ids=[meeting_id],
+            with_payload=["topic", "summary", "vtt_content"],
+            with_vectors=False,
+        )
+    if not points:
+        return {}
+    meeting = {
+        "id": str(points[0].id),
+        "topic": points[0].payload.get("topic", "N/A"),
+        "summary": points[0].payload.get("summary", {}),
+    }
+    content = get_transcript_store().read_point(meeting["id"])
+    if content is None:
+        content = points[0].payload.get("vtt_content")
+    if content is None:
+        print(f"LOG: Transcript of meeting {meeting_id} is unavailable")
+        return {
+            **meeting,
+            "error": "Transcript unavailable: it is not in the transcript cache "
+            "of this host. Reload the meeting data to restore it.",
+        }
+    return {**meeting, "content": content}
 
 
 class MeetingData:
@@ -36,59 +606,89 @@ class MeetingData:
     def _initialize(self):
         """Initialize the instance only once"""
         self.data_dir = Path(__file__).parent.parent / "data"
+        self.transcripts = get_transcript_store()
         self.meetings = self._load_meetings()
 
-        # Initialize clients
-        self.qdrant_client = QdrantClient(
-            url=os.getenv("qdrantUrl"), api_key=os.getenv("qdrantApiKey")
+        # Initialize clients, shared with the crew tools
+        self.qdrant_client = get_qdrant_client()
+        self.embedding_model = get_embedding_model()
+        self.collection_profile = get_profile()
+
+        # Ensure collection exists and is populated. If Qdrant is unreachable, the
+        # meetings are served from the local vector index, and queued writes are kept
+        # for the next start
+        self.qdrant_available = self._ensure_collection_exists()
+        self.upsert_writer = UpsertWriter(self.qdrant_client, COLLECTION_NAME)
+        if self.qdrant_available:
+            self.upsert_writer.replay()
+        self.digests = DigestPipeline(
+            self.qdrant_client,
+            COLLECTION_NAME,
+            read_transcript=self.transcripts.read_point,
         )
-        self.openai_client = OpenAI()
-        self.embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-
-        # Ensure collection exists and is populated
-        self._ensure_collection_exists()
         self._populate_collection()
 
         # Check Qdrant status after loading
         self._check_qdrant_status()
         print(f"LOG: Initialized MeetingData with directory: {self.data_dir}")
 
-    def _base64_to_uuid(self, base64_string: str) -> str:
-        """Convert base64 string to UUID."""
+    def _ensure_collection_exists(self) -> bool:
+        """Create the Qdrant collection if it doesn't exist. False if Qdrant is down."""
         try:
-            base64_string = base64_string.rstrip("=")
-            byte_string = base64.urlsafe_b64decode(
-                base64_string + "==" * (-len(base64_string) % 4)
+            exists = self.qdrant_client.collection_exists(COLLECTION_NAME)
+        except Exception as e:
+            print(f"LOG: Qdrant is unreachable, using the local vector index: {e}")
+            return False
+        if exists:
+            print(f"LOG: Collection '{COLLECTION_NAME}' already exists")
+        else:
+            print(
+                f"LOG: Creating collection '{COLLECTION_NAME}' "
+                f"with the '{self.collection_profile.name}' profile..."
             )
-            return str(uuid.UUID(bytes=byte_string[:16]))
-        except Exception:
-            return str(uuid.uuid4())
-
-    def _ensure_collection_exists(self):
-        """Create the Qdrant collection if it doesn't exist."""
-        try:
-            self.qdrant_client.get_collection("zoom_recordings")
-            print("LOG: Collection 'zoom_recordings' already exists")
-        except Exception:
-            print("LOG: Creating collection 'zoom_recordings'...")
-            self.qdrant_client.recreate_collection(
-                collection_name="zoom_recordings",
-                vectors_config=models.VectorParams(
-                    size=384,  # SentenceTransformer dimension
-                    distance=models.Distance.COSINE,
-                ),
+            create_collection(
+                self.qdrant_client, COLLECTION_NAME, self.collection_profile
             )
             print("LOG: Collection created successfully")
 
+        self._ensure_payload_indexes()
+        return True
+
+    def _ensure_payload_indexes(self):
+        """Create the typed payload indexes used by the metadata filters."""
+        try:
+            existing = self.qdrant_client.get_collection(COLLECTION_NAME).payload_schema
+            for field_name, field_schema in PAYLOAD_INDEXES.items():
+                if field_name in existing:
+                    continue
+                print(
+                    f"LOG: Creating {field_schema.value} payload index on {field_name}"
+                )
+                self.qdrant_client.create_payload_index(
+                    collection_name=COLLECTION_NAME,
+                    field_name=field_name,
+                    field_schema=field_schema,
+                )
+        except Exception as e:
+            print(f"LOG: Error creating payload indexes: {e}")
+
     def _populate_collection(self):
         """Populate the Qdrant collection with meeting data."""
         print("LOG: Starting collection population...")
+        if not self.qdrant_available and len(get_local_index()) >= len(self.meetings):
+            print("LOG: Serving the meetings from the local vector index")
+            return
 
         try:
             # Get existing points count
-            collection_info = self.qdrant_client.get_collection("zoom_recordings")
+            collection_info = self.qdrant_client.get_collection(COLLECTION_NAME)
             if collection_info.points_count >= len(self.meetings):
                 print("LOG: Collection already populated")
+                # Build the local fallback index of collections ingested before it existed
+                if len(get_local_index()) < collection_info.points_count:
+                    get_local_index().rebuild_from(self.qdrant_client, COLLECTION_NAME)
+                # Backfill digests of meetings ingested before the pipeline existed
+                self.digests.start()
                 return
         except Exception as e:
             print(f"LOG: Error checking collection: {e}")
@@ -97,34 +697,14 @@ class MeetingData:
         points = []
         for i, meeting in enumerate(self.meetings):
             try:
-                # Create text for embedding
-                text_to_embed = f"""
-                Topic: {meeting.get('topic', '')}
-                Content: {meeting.get('vtt_content', '')}
-                Summary: {json.dumps(meeting.get('summary', {}))}
-                """
+                transcript = self.get_transcript(meeting)
 
-                # Get embedding from SentenceTransformer instead of OpenAI
-                vector = self.embedding_model.encode(text_to_embed).tolist()
-
-                # Create point ID from meeting UUID if available
-                point_id = self._base64_to_uuid(meeting.get("uuid", str(uuid.uuid4())))
-
-                # Create point
-                points.append(
-                    models.PointStruct(
-                        id=point_id,
-                        vector=vector,
-                        payload={
-                            "topic": meeting.get("topic"),
-                            "start_time": meeting.get("start_time"),
-                            "duration": meeting.get("duration"),
-                            "summary": meeting.get("summary"),
-                            "vtt_content": meeting.get("vtt_content"),
-                            "user": meeting.get("user"),
-                        },
-                    )
-                )
+                # Get embedding from the local embedding model
+                vector = self.embedding_model.encode(
+                    meeting_text(meeting, transcript)
+                ).tolist()
+
+                points.append(meeting_point(meeting, transcript, vector))
 
                 if (i + 1) % 100 == 0:
                     print(f"LOG: Processed {i + 1} meetings...")
@@ -132,54 +712,40 @@ class MeetingData:
             except Exception as e:
                 print(f"LOG: Error processing meeting {i}: {e}")
 
-        # Insert points in batches
-        batch_size = 100
-        for i in range(0, len(points), batch_size):
-            batch = points[i : i + batch_size]
-            try:
-                self.qdrant_client.upsert(
-                    collection_name="zoom_recordings", points=batch
-                )
-                print(
-                    f"LOG: Inserted batch {i//batch_size + 1} of {len(points)//batch_size + 1}"
-                )
-            except Exception as e:
-                print(f"LOG: Error inserting batch: {e}")
+        # The local fallback index is kept up to date even if Qdrant is down
+        get_local_index().upsert(points)
 
-        print("LOG: Collection population complete")
+        # Batches that fail after retries are queued and replayed on the next start
+        self.upsert_writer.write(points)
 
-    def _load_meetings(self) -> List[Dict[str, Any]]:
-        """Load all meeting data from JSON files in the data directory."""
-        all_meetings = []
+        for callback in _ingest_listeners:
+            callback()
 
-        # Walk through all files in the data directory
-        for file_path in self.data_dir.glob("*.txt"):
-            try:
-                print(f"LOG: Loading data from {file_path}")
-                with open(file_path, "r") as f:
-                    data = json.load(f)
-                    # Extract meetings from the recordings array
-                    if "recordings" in data:
-                        for recording in data["recordings"]:
-                            # Add user info to each recording
-                            recording["user"] = {
-                                "firstname": data.get("firstname"),
-                                "lastname": data.get("lastname"),
-                                "email": data.get("email"),
-                            }
-                            all_meetings.append(recording)
-            except Exception as e:
-                print(f"LOG: Error loading file {file_path}: {e}")
+        # Compact per-meeting digests are computed in the background
+        if self.qdrant_available:
+            self.digests.start()
 
-        print(f"LOG: Loaded {len(all_meetings)} meetings total")
-        return all_meetings
+        print("LOG: Collection population complete")
+
+    def _load_meetings(self) -> List[Dict[str, Any]]:
+        """
+        Load all meeting data from JSON files in the data directory. Files are parsed in
+        parallel and their transcripts are kept on disk, see `get_transcript`.
+        """
+        return load_meetings(self.data_dir)
+
+    def get_transcript(self, meeting: Dict[str, Any]) -> str:
+        """Read the full transcript of a loaded meeting from disk."""
+        if "vtt_content" in meeting:
+            return meeting["vtt_content"] or ""
+        return self.transcripts.read(meeting.get("_transcript"))
 
     def _check_qdrant_status(self):
         """Check if meetings are properly indexed in Qdrant."""
         try:
             # Get collection info
-            print(f"LOG: Connecting to Qdrant at: {os.getenv('qdrantUrl')}")
-            collection_info = self.qdrant_client.get_collection("zoom_recordings")
+            print(f"LOG: Connecting to Qdrant at: {qdrant_settings()[0]}")
+            collection_info = self.qdrant_client.get_collection(COLLECTION_NAME)
             points_count = collection_info.points_count
 
             print("LOG: Qdrant collection status:")
@@ -189,7 +755,7 @@ class MeetingData:
             if points_count < len(self.meetings):
                 print("LOG: WARNING - Some meetings may not be indexed in Qdrant!")
                 print(
-                    "LOG: Run the indexing script to ensure all meetings are searchable."
+                    "LOG: Run vector/reindex.py to ensure all meetings are searchable."
                 )
             elif points_count > len(self.meetings):
                 print("LOG: WARNING - More points in Qdrant than loaded meetings!")
@@ -201,66 +767,100 @@ class MeetingData:
             print(f"LOG: Error checking Qdrant status: {e}")
             print("LOG: WARNING - Qdrant collection may not be properly configured!")
 
-    def search_meetings(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Search through meetings using vector search"""
+    def search_meetings(
+        self, query: str, limit: int = 10, prefer_recent: bool = False, **filters
+    ) -> List[Dict[str, Any]]:
+        """
+        Search through meetings using vector search. Optional `filters` (start_after,
+        start_before, user_email, min_duration) are applied by Qdrant during the search.
+        With `prefer_recent`, Qdrant boosts the similarity of recent meetings, see
+        `recency.py`.
+        """
         print(f"LOG: Searching meetings with query: {query}")
 
         # For statistical queries, return all meetings
-        if any(
-            word in query.lower()
-            for word in ["average", "mean", "total", "count", "statistics"]
-        ):
+        if self._is_statistical(query):
             print("LOG: Statistical query detected - returning all meetings")
-            return self.meetings
+            # Statistics only need the metadata, not summaries or transcripts
+            return [
+                project(m, STATISTIC_FIELDS)
+                for m in self.meetings
+                if not filters or _matches_filters(m, **filters)
+            ]
 
         try:
-            # Get embedding from OpenAI
-            print("LOG: Getting OpenAI embedding for query")
-            response = self.openai_client.embeddings.create(
-                model="text-embedding-ada-002", input=query
-            )
-            query_vector = response.data[0].embedding
-
-            # Search Qdrant with limit of 10
-            print("LOG: Searching Qdrant")
-            vector_results = self.qdrant_client.search(
-                collection_name="zoom_recordings",
-                query_vector=query_vector,
-                limit=10,  # Changed from default to 10
-                score_threshold=0.7,  # Only return good matches
-            )
-
+            vector_results = search_collection(query, limit, prefer_recent, **filters)
             if vector_results:
-                print(f"LOG: Found {len(vector_results)} matches in Qdrant")
-                return [
-                    {
-                        "score": hit.score,
-                        "topic": hit.payload.get("topic", "N/A"),
-                        "start_time": hit.payload.get("start_time", "N/A"),
-                        "duration": hit.payload.get("duration", "N/A"),
-                        "summary": hit.payload.get("summary", {}),
-                        "user": hit.payload.get("user", {}),
-                        "content": hit.payload.get("vtt_content", ""),
-                    }
-                    for hit in vector_results
-                ]
+                return vector_results
+            print("LOG: No vector matches found, falling back to content matching")
+        except Exception as e:
+            print(f"LOG: Vector search failed: {e}")
+            print("LOG: Falling back to content matching")
+
+        return self._match_content(query, limit, **filters)
+
+    async def asearch_meetings(
+        self, query: str, limit: int = 10, prefer_recent: bool = False, **filters
+    ) -> List[Dict[str, Any]]:
+        """Asyncio counterpart of `search_meetings`, built on AsyncQdrantClient."""
+        return (
+            await self.asearch_meetings_batch([query], limit, prefer_recent, **filters)
+        )[0]
+
+    async def asearch_meetings_batch(
+        self,
+        queries: List[str],
+        limit: int = 10,
+        prefer_recent: bool = False,
+        **filters,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search several queries concurrently, e.g. the sub-queries of an agent run. Vector
+        searches go to Qdrant in a single batch request, or to the local vector index if
+        it is unreachable; statistical queries and queries without vector matches are
+        answered like in `search_meetings`.
+        """
+        print(f"LOG: Searching meetings with {len(queries)} queries")
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(queries)
+        vector_queries = []
+        for i, query in enumerate(queries):
+            if self._is_statistical(query):
+                results[i] = self.search_meetings(query, limit, **filters)
             else:
-                print("LOG: No vector matches found, falling back to content matching")
+                vector_queries.append(i)
 
+        try:
+            batch_results = await asearch_collection_batch(
+                [queries[i] for i in vector_queries], limit, prefer_recent, **filters
+            )
+            for i, hits in zip(vector_queries, batch_results):
+                results[i] = hits or None
         except Exception as e:
-            print(f"LOG: Vector search failed: {e}")
+            print(f"LOG: Vector batch search failed: {e}")
             print("LOG: Falling back to content matching")
 
-        # Fallback to content matching
+        return [
+            hits if hits is not None else self._match_content(query, limit, **filters)
+            for query, hits in zip(queries, results)
+        ]
+
+    def _is_statistical(self, query: str) -> bool:
+        # Whole words only, so e.g. "discount" is not a count
+        return STATISTICAL_QUERY.search(query) is not None
+
+    def _match_content(
+        self, query: str, limit: int = 10, **filters
+    ) -> List[Dict[str, Any]]:
+        """Fallback to content matching over the loaded meetings."""
         matches = []
         for meeting in self.meetings:
+            if filters and not _matches_filters(meeting, **filters):
+                continue
             score = 0
+            transcript = self.get_transcript(meeting)
             if query.lower() in meeting["topic"].lower():
                 score += 0.5
-            if (
-                "vtt_content" in meeting
-                and query.lower() in meeting["vtt_content"].lower()
-            ):
+            if query.lower() in transcript.lower():
                 score += 0.3
             if (
                 "summary" in meeting
@@ -275,9 +875,10 @@ class MeetingData:
                         "topic": meeting["topic"],
                         "start_time": meeting["start_time"],
                         "duration": meeting["duration"],
-                        "summary": meeting.get("summary", {}),
+                        "summary": (meeting.get("summary") or {}).get(
+                            "summary_overview", "N/A"
+                        ),
                         "user": meeting.get("user", {}),
-                        "content": meeting.get("vtt_content", ""),
                     }
                 )
 
@@ -285,6 +886,10 @@ class MeetingData:
         print(f"LOG: Found {len(matches)} matches using content matching")
         return matches[:limit]
 
+    def fetch_transcript(self, meeting_id: str) -> Dict[str, Any]:
+        """Fetch the full transcript and summary of a single meeting."""
+        return fetch_transcript(meeting_id)
+
     def get_average_duration(self) -> float:
         """Calculate and return the average meeting duration."""
         if not self.meetings:
@@ -307,6 +912,9 @@ if __name__ == "__main__":
     print("\nLOG: Basic meeting stats:")
     print(f"LOG: - Number of meetings loaded: {len(meeting_data.meetings)}")
 
+    # Let the background digest pipeline finish before the script exits
+    meeting_data.digests.wait()
+
     # Test search functionality
     test_query = "marketing strategy"
     print(f"\nLOG: Testing search with query: '{test_query}'")
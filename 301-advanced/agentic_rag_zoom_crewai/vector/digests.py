@@ -0,0 +1,179 @@
+import os
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from llm_clients import get_analysis_client, message_text
+from meeting_analysis import ANALYSIS_MODEL, parse_json_object
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+MAX_ITEMS = 8
+MAX_ITEM_CHARS = 240
+
+# Speaker prefix of a transcript cue, e.g. "Jane Doe: Let's get started"
+SPEAKER_PATTERN = re.compile(r"^([A-Z][\w.'-]*(?: [A-Z][\w.'-]*){0,3}): ", re.MULTILINE)
+
+DIGEST_PROMPT = """
+        Write a compact digest of this meeting.
+
+        Topic: {topic}
+        Summary: {summary}
+        Transcript excerpt: {transcript}
+
+        Answer with a JSON object only, with the keys "key_points", "decisions" and
+        "participants", each a list of short strings.
+        """
+
+
+def _item_text(item: Any) -> str:
+    if isinstance(item, dict):
+        label, summary = item.get("label"), item.get("summary")
+        text = f"{label}: {summary}" if label and summary else str(summary or label)
+    else:
+        text = str(item)
+    return text[:MAX_ITEM_CHARS]
+
+
+def build_extractive_digest(
+    summary: Optional[Dict[str, Any]], transcript: Optional[str]
+) -> Dict[str, List[str]]:
+    """Build a digest from the structured summary and the speakers of the transcript."""
+    summary = summary or {}
+    speakers = Counter(SPEAKER_PATTERN.findall(transcript or ""))
+    return {
+        "key_points": [
+            _item_text(item) for item in summary.get("summary_details") or []
+        ][:MAX_ITEMS],
+        "decisions": [_item_text(item) for item in summary.get("next_steps") or []][
+            :MAX_ITEMS
+        ],
+        "participants": [name for name, _ in speakers.most_common(MAX_ITEMS)],
+    }
+
+
+def build_llm_digest(
+    payload: Dict[str, Any], transcript: Optional[str]
+) -> Dict[str, List[str]]:
+    """Ask the analysis model for a digest, falling back to the extractive one."""
+    extractive = build_extractive_digest(payload.get("summary"), transcript)
+    message = get_analysis_client().messages.create(
+        model=ANALYSIS_MODEL,
+        max_tokens=500,
+        temperature=0,
+        messages=[
+            {
+                "role": "user",
+                "content": DIGEST_PROMPT.format(
+                    topic=payload.get("topic"),
+                    summary=payload.get("summary"),
+                    transcript=(transcript or "")[:8000],
+                ),
+            }
+        ],
+    )
+    digest = parse_json_object(message_text(message))
+    return {
+        key: [str(item)[:MAX_ITEM_CHARS] for item in digest.get(key) or []][:MAX_ITEMS]
+        or extractive[key]
+        for key in extractive
+    }
+
+
+class DigestPipeline:
+    """
+    Background enrichment of the meetings collection. Points without a `digest` payload
+    field are scrolled in batches, digested in parallel and updated in place, so the
+    summarization cost is paid once per meeting at ingestion instead of per query.
+    Transcripts are read with `read_transcript`, from the point ID, as they are not
+    stored in the payload.
+    """
+
+    def __init__(
+        self,
+        qdrant_client: QdrantClient,
+        collection_name: str,
+        batch_size: int = 32,
+        max_workers: int = 4,
+        mode: Optional[str] = None,
+        read_transcript: Optional[Callable[[str], Optional[str]]] = None,
+    ):
+        self.qdrant_client = qdrant_client
+        self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        # DIGEST_MODE: "extractive" builds digests from the summary and the transcript
+        # speakers, "llm" asks the analysis model to write them
+        self.mode = mode or os.getenv("DIGEST_MODE", "extractive")
+        self.read_transcript = read_transcript
+        self._thread: Optional[threading.Thread] = None
+
+    def _digest(self, point: models.Record) -> Dict[str, List[str]]:
+        payload = point.payload
+        # Points ingested while transcripts were stored in the payload still have them
+        transcript = payload.get("vtt_content")
+        if transcript is None and self.read_transcript is not None:
+            transcript = self.read_transcript(str(point.id))
+        if self.mode == "llm":
+            try:
+                return build_llm_digest(payload, transcript)
+            except Exception as e:
+                print(f"LOG: LLM digest failed, using extractive digest: {e}")
+        return build_extractive_digest(payload.get("summary"), transcript)
+
+    def run(self) -> int:
+        """Digest all the points that do not have a digest yet, return their number."""
+        missing_digest = models.Filter(
+            must=[models.IsEmptyCondition(is_empty=models.PayloadField(key="digest"))]
+        )
+        digested = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                # Digested points drop out of the filter, so always read the first page
+                points, _ = self.qdrant_client.scroll(
+                    collection_name=self.collection_name,
+                    scroll_filter=missing_digest,
+                    limit=self.batch_size,
+                    with_payload=["topic", "summary", "vtt_content"],
+                    with_vectors=False,
+                )
+                if not points:
+                    break
+
+                digests = list(executor.map(self._digest, points))
+                self.qdrant_client.batch_update_points(
+                    collection_name=self.collection_name,
+                    update_operations=[
+                        models.SetPayloadOperation(
+                            set_payload=models.SetPayload(
+                                payload={"digest": digest}, points=[point.id]
+                            )
+                        )
+                        for point, digest in zip(points, digests)
+                    ],
+                )
+                digested += len(points)
+                print(f"LOG: Digested {digested} meetings...")
+
+        print(f"LOG: Digest pipeline complete, {digested} meetings digested")
+        return digested
+
+    def start(self):
+        """Run the pipeline in a background thread, unless it is already running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run_safely, daemon=True)
+        self._thread.start()
+
+    def _run_safely(self):
+        try:
+            self.run()
+        except Exception as e:
+            print(f"LOG: Digest pipeline failed: {e}")
+
+    def wait(self, timeout: Optional[float] = None):
+        """Wait for the background run to finish."""
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,165 @@
+import argparse
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+BACKENDS = ["torch", "onnx", "fastembed"]
+
+# Meeting-like texts for the parity check
+PARITY_TEXTS = [
+    "Quarterly marketing strategy review",
+    "Jane Doe: Let's go over the launch checklist for the new pricing page",
+    "Decisions: hire two backend engineers, move the release to next sprint",
+    "What was discussed in recent API meetings?",
+    "Summary: the team reviewed customer feedback on onboarding and agreed to "
+    "simplify the signup flow before the end of the quarter",
+    "Budget review with finance, travel costs are over plan",
+    "Incident postmortem: the search cluster ran out of memory during reindexing",
+    "Weekly sync",
+]
+
+
+def embedding_backend() -> str:
+    """
+    The EMBEDDING_BACKEND: "torch" (SentenceTransformer in float32, the default), "onnx"
+    (SentenceTransformer on ONNX Runtime) or "fastembed" (FastEmbed, ONNX Runtime
+    without PyTorch). Read when used, so values from .env.local apply.
+    """
+    return os.getenv("EMBEDDING_BACKEND", "torch")
+
+
+def embedding_onnx_file() -> str:
+    """
+    The ONNX export used by the "onnx" backend, EMBEDDING_ONNX_FILE. The default is the
+    int8 dynamically quantized export published with the model; use "onnx/model.onnx"
+    for float32.
+    """
+    return os.getenv("EMBEDDING_ONNX_FILE", "onnx/model_quint8_avx2.onnx")
+
+
+class Embedder:
+    """
+    all-MiniLM-L6-v2 behind a selectable backend. Every backend returns normalized
+    float32 vectors of the same 384-dim space, so ingestion and queries can use
+    different backends. `encode` follows `SentenceTransformer.encode`: a string gives
+    one vector, a list of strings a matrix.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[str] = None,
+        model_name: str = EMBEDDING_MODEL_NAME,
+        onnx_file: Optional[str] = None,
+    ):
+        backend = backend or embedding_backend()
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown embedding backend {backend!r}, use one of {BACKENDS}"
+            )
+        self.backend = backend
+        self.model_name = model_name
+
+        if backend == "fastembed":
+            from fastembed import TextEmbedding
+
+            self._model = TextEmbedding(
+                model_name=f"sentence-transformers/{model_name}"
+            )
+            return
+
+        from sentence_transformers import SentenceTransformer
+
+        if backend == "onnx":
+            self._model = SentenceTransformer(
+                model_name,
+                backend="onnx",
+                model_kwargs={"file_name": onnx_file or embedding_onnx_file()},
+            )
+        else:
+            self._model = SentenceTransformer(model_name)
+
+    def encode(
+        self, texts: Union[str, List[str]], batch_size: int = 32, **kwargs
+    ) -> np.ndarray:
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        if self.backend == "fastembed":
+            vectors = np.stack(list(self._model.embed(batch, batch_size=batch_size)))
+        else:
+            vectors = self._model.encode(
+                batch, batch_size=batch_size, normalize_embeddings=True
+            )
+        vectors = np.asarray(vectors, dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors[0] if single else vectors
+
+
+def check_parity(
+    candidate: Embedder, reference: Embedder, texts: List[str] = PARITY_TEXTS
+) -> Dict[str, Any]:
+    """
+    Compare the embeddings of two backends: the cosine similarity of each text's
+    vectors, and how often both backends agree on each text's nearest neighbours.
+    """
+    candidate_vectors = candidate.encode(texts)
+    reference_vectors = reference.encode(texts)
+    cosines = np.sum(candidate_vectors * reference_vectors, axis=1)
+    k = min(3, len(texts))
+    candidate_top = np.argsort(-(candidate_vectors @ candidate_vectors.T), axis=1)
+    reference_top = np.argsort(-(reference_vectors @ reference_vectors.T), axis=1)
+    top_k_agreement = np.mean(
+        [
+            len(set(candidate_top[i, :k]) & set(reference_top[i, :k])) / k
+            for i in range(len(texts))
+        ]
+    )
+    return {
+        "texts": len(texts),
+        "min_cosine": round(float(cosines.min()), 5),
+        "mean_cosine": round(float(cosines.mean()), 5),
+        f"top_{k}_agreement": round(float(top_k_agreement), 3),
+    }
+
+
+def _load_and_time(backend: str, texts: List[str]):
+    start = time.perf_counter()
+    embedder = Embedder(backend)
+    load_seconds = time.perf_counter() - start
+    embedder.encode(texts[:1])
+    start = time.perf_counter()
+    embedder.encode(texts)
+    texts_per_second = len(texts) / (time.perf_counter() - start)
+    return embedder, load_seconds, texts_per_second
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check that an embedding backend matches the reference backend"
+    )
+    parser.add_argument("--backend", choices=BACKENDS, default="onnx")
+    parser.add_argument("--reference", choices=BACKENDS, default="torch")
+    parser.add_argument("--threshold", type=float, default=0.98)
+    parser.add_argument(
+        "--repeat", type=int, default=32, help="Copies of the texts to time encoding"
+    )
+    args = parser.parse_args()
+
+    timing_texts = PARITY_TEXTS * args.repeat
+    results = {}
+    for backend in (args.reference, args.backend):
+        results[backend] = _load_and_time(backend, timing_texts)
+        print(
+            f"LOG: {backend}: loaded in {results[backend][1]:.2f}s, "
+            f"{results[backend][2]:.0f} texts/s"
+        )
+
+    parity = check_parity(results[args.backend][0], results[args.reference][0])
+    print(f"LOG: Parity of {args.backend} against {args.reference}: {parity}")
+    if parity["min_cosine"] < args.threshold:
+        print(f"LOG: Minimum cosine similarity is below {args.threshold}")
+        sys.exit(1)
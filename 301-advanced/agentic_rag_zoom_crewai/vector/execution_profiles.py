@@ -0,0 +1,66 @@
+from dataclasses import dataclass, replace
+from typing import Dict, Optional, Tuple
+
+from context_packing import DEFAULT_FIELDS
+from meeting_analysis import ANALYSIS_MODEL
+
+
+@dataclass(frozen=True)
+class ExecutionProfile:
+    """
+    Per-request retrieval and analysis settings. Deeper profiles retrieve and keep more
+    context and analyze with a larger model, at the cost of latency and tokens.
+    """
+
+    name: str
+    search_limit: int = 10
+    search_token_budget: int = 1500
+    search_fields: Tuple[str, ...] = tuple(DEFAULT_FIELDS)
+    transcript_token_budget: int = 4000
+    analysis_model: str = ANALYSIS_MODEL
+    analysis_max_tokens: int = 1000
+    analysis_batch_token_budget: int = 6000
+
+    @property
+    def cache_scope(self) -> str:
+        """Responses are only reused between requests with the same settings."""
+        return f"{self.name}:{self.search_limit}"
+
+
+PROFILES: Dict[str, ExecutionProfile] = {
+    # Short summaries only and a small, fast model
+    "Basic": ExecutionProfile(
+        name="Basic",
+        search_token_budget=800,
+        search_fields=("id", "score", "topic", "start_time", "duration", "summary"),
+        transcript_token_budget=1500,
+        analysis_model="claude-3-haiku-20240307",
+        analysis_max_tokens=500,
+        analysis_batch_token_budget=4000,
+    ),
+    # The original settings
+    "Standard": ExecutionProfile(name="Standard"),
+    # More context per result and the largest model
+    "Detailed": ExecutionProfile(
+        name="Detailed",
+        search_token_budget=3000,
+        transcript_token_budget=8000,
+        analysis_model="claude-3-opus-20240229",
+        analysis_max_tokens=2000,
+        analysis_batch_token_budget=8000,
+    ),
+}
+
+
+def get_execution_profile(
+    depth: str = "Standard", search_limit: Optional[int] = None
+) -> ExecutionProfile:
+    """Return the profile for an analysis depth, optionally with a custom search limit."""
+    if depth not in PROFILES:
+        raise ValueError(
+            f"Unknown analysis depth {depth!r}, use one of {list(PROFILES)}"
+        )
+    profile = PROFILES[depth]
+    if search_limit is not None:
+        profile = replace(profile, search_limit=search_limit)
+    return profile
@@ -0,0 +1,79 @@
+import functools
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+
+class StubAnthropicClient:
+    """
+    Deterministic, offline stand-in for `anthropic.Anthropic`. It implements the subset of
+    `client.messages.create` used by the analysis tool, with a configurable latency, so
+    the analysis pipeline can be tested and load-tested without network access.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self.messages = self
+        self._lock = threading.Lock()
+
+    def create(
+        self, model: str, max_tokens: int, messages: List[Dict[str, Any]], **kwargs
+    ) -> SimpleNamespace:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+
+        prompt = messages[-1]["content"]
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        topics = re.findall(r"Topic: (.*)", prompt)
+        if "JSON object" in prompt:
+            # Per-meeting analyses, keyed by the meeting numbers in the prompt
+            numbers = re.findall(r"Meeting (\d+):", prompt)
+            text = json.dumps(
+                {
+                    number: f"[stub {model}] Analysis of meeting: {topic.strip()}"
+                    for number, topic in zip(numbers, topics)
+                }
+            )
+        else:
+            text = f"[stub {model} {digest}] Analysis of {len(topics)} meetings: " + (
+                "; ".join(topic.strip() for topic in topics) or "no topics found"
+            )
+        # Like the real API, answers are cut off at max_tokens
+        text = text[: max_tokens * 4]
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=text)],
+            usage=SimpleNamespace(
+                input_tokens=len(prompt) // 4, output_tokens=len(text) // 4
+            ),
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def get_analysis_client():
+    """
+    Return the client used for meeting analysis, created once and shared, so its
+    connection pool is reused across calls. Set ANALYSIS_LLM=stub to use the offline
+    stub, with ANALYSIS_STUB_LATENCY seconds of simulated latency per call.
+    """
+    if os.getenv("ANALYSIS_LLM") == "stub":
+        return StubAnthropicClient(
+            latency=float(os.getenv("ANALYSIS_STUB_LATENCY", 0.0))
+        )
+
+    import anthropic
+
+    return anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+
+
+def message_text(message: Any) -> str:
+    """Join the text blocks of an Anthropic message."""
+    return "".join(
+        block.text for block in message.content if getattr(block, "type", "") == "text"
+    )
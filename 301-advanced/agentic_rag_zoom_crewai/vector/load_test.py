@@ -0,0 +1,341 @@
+import argparse
+import json
+import os
+import re
+import resource
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from analysis_store import AnalysisStore
+from benchmark_search import (
+    TOPICS,
+    generate_meetings,
+    ingest,
+    model_embedder,
+    percentiles,
+)
+from collection_profiles import COLLECTION_NAME
+from context_packing import pack_results
+from data_loader import meeting_text
+from llm_clients import StubAnthropicClient
+from meeting_analysis import MapReduceAnalyzer
+
+RESULTS_DIR = Path(__file__).parent.parent / ".cache" / "load_tests"
+
+# The research task description written by crew.py, used to find the user query
+QUERY_PATTERN = re.compile(r"Process this query: '(.*?)'", re.DOTALL)
+
+
+class StubLLMServer:
+    """
+    Local OpenAI-compatible server with deterministic chat completions and a
+    configurable latency per call. Agents with tools are answered with one
+    search_meetings call followed by a final answer, so every query exercises the
+    tools. Query embeddings come from the local model.
+    """
+
+    def __init__(self, chat_latency: float = 0.0):
+        self.chat_latency = chat_latency
+        self.chat_calls = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "chat_calls": self.chat_calls,
+                "busy_seconds": self.busy_seconds,
+            }
+
+    def _record(self, counter: str, seconds: float):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+            self.busy_seconds += seconds
+
+    def chat(self, messages: List[Dict[str, Any]]) -> str:
+        prompt = "\n".join(str(m.get("content") or "") for m in messages)
+        query = QUERY_PATTERN.search(prompt)
+        if query and "search_meetings" in prompt and "Observation:" not in prompt:
+            return (
+                "Thought: I should search the meeting recordings\n"
+                "Action: search_meetings\n"
+                f"Action Input: {json.dumps({'query': query.group(1)})}"
+            )
+        return (
+            "Thought: I now know the final answer\n"
+            f"Final Answer: [stub] Answer based on {prompt.count('Observation:')} "
+            "tool results"
+        )
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                start = time.perf_counter()
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if self.path.endswith("/chat/completions"):
+                    time.sleep(stub.chat_latency)
+                    response = stub._chat_response(body)
+                    stub._record("chat_calls", time.perf_counter() - start)
+                else:
+                    self.send_error(404)
+                    return
+                data = json.dumps(response).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def _chat_response(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        content = self.chat(body.get("messages", []))
+        prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+        return {
+            "id": f"chatcmpl-stub-{self.chat_calls}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": prompt_tokens + len(content) // 4,
+            },
+        }
+
+    def start(self, port: int = 0):
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"LOG: Stub LLM server listening on {self.url}")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+def rss_mb() -> float:
+    """Current resident memory of the process, or its peak where that is unknown."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def check_packed_analysis(meetings: int = 12):
+    """
+    Pack search hits the way the search tools do and analyze them the way the analysis
+    tool does, with the stub client. The agents pass the packed hits on unchanged, so
+    both must agree on their format; this fails fast before a load test if they do not.
+    """
+    hits = [
+        {
+            "id": f"meeting-{i}",
+            "score": 0.9 - i / 100,
+            "topic": f"{TOPICS[i % len(TOPICS)]} sync #{i}",
+            "start_time": f"2024-03-{i + 1:02d}T10:00:00Z",
+            "duration": 30,
+            "summary": f"Overview of meeting {i}",
+            "digest": {"key_points": [f"Point {i}"], "decisions": [f"Decision {i}"]},
+        }
+        for i in range(meetings)
+    ]
+    packed = pack_results(hits, token_budget=100_000)["results"]
+    assert len(packed) == meetings, "Packed results lost meetings"
+
+    with tempfile.TemporaryDirectory() as directory:
+        for store in (None, AnalysisStore(Path(directory) / "analyses.sqlite3")):
+            # A small batch budget, so the map and reduce steps are exercised too
+            analyzer = MapReduceAnalyzer(
+                StubAnthropicClient(), batch_token_budget=200, store=store
+            )
+            result = analyzer.analyze(packed)
+            assert result["batches"] > 1, "Packed results were not split into batches"
+            assert result["analysis"], "Packed results were not analyzed"
+    print(f"LOG: Analyzed {meetings} packed search results")
+
+
+def run_level(
+    get_crew_response,
+    queries: List[str],
+    concurrency: int,
+    server: StubLLMServer,
+    analysis_client: Any,
+    analysis_latency: float,
+) -> Dict[str, Any]:
+    """Answer all the queries with `concurrency` parallel workers and measure it."""
+    print(f"LOG: Running {len(queries)} queries with concurrency {concurrency}")
+    stats_before = server.stats()
+    analysis_calls_before = getattr(analysis_client, "calls", 0)
+    memory_before = rss_mb()
+    latencies, errors = [], []
+
+    def answer(query: str):
+        start = time.perf_counter()
+        try:
+            get_crew_response(query)
+            latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(str(e))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(answer, queries))
+    wall_seconds = time.perf_counter() - start
+
+    stats = server.stats()
+    chat_calls = stats["chat_calls"] - stats_before["chat_calls"]
+    analysis_calls = getattr(analysis_client, "calls", 0) - analysis_calls_before
+    answered = max(len(latencies), 1)
+    # Time the stubs spent per query; the rest of the latency is our own overhead
+    stub_seconds = (
+        stats["busy_seconds"]
+        - stats_before["busy_seconds"]
+        + analysis_calls * analysis_latency
+    ) / answered
+
+    result = {
+        "concurrency": concurrency,
+        "queries": len(queries),
+        "errors": len(errors),
+        "throughput_qps": round(len(latencies) / wall_seconds, 3),
+        "latency": percentiles(latencies) if latencies else {},
+        "llm_calls_per_query": round((chat_calls + analysis_calls) / answered, 2),
+        "chat_calls_per_query": round(chat_calls / answered, 2),
+        "analysis_calls_per_query": round(analysis_calls / answered, 2),
+        "stub_ms_per_query": round(stub_seconds * 1000, 3),
+        "memory_mb": {"before": memory_before, "after": rss_mb()},
+    }
+    if latencies:
+        result["overhead_ms_per_query"] = round(
+            result["latency"]["mean_ms"] - stub_seconds * 1000, 3
+        )
+    if errors:
+        result["sample_errors"] = errors[:3]
+    return result
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Load test get_crew_response against local stub LLMs"
+    )
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--analysis-latency", type=float, default=0.5)
+    parser.add_argument(
+        "--qdrant-url",
+        default=":memory:",
+        help="Qdrant to search. The default in-process instance is seeded with "
+        "synthetic meetings",
+    )
+    parser.add_argument("--seed-meetings", type=int, default=1000)
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Keep the response cache enabled, so repeated queries are cache hits",
+    )
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    check_packed_analysis()
+
+    server = StubLLMServer(args.llm_latency)
+    server.start()
+
+    # Point every client at the stubs before the crew modules create them
+    os.environ.update(
+        {
+            "OPENAI_API_KEY": "stub",
+            "OPENAI_BASE_URL": server.url,
+            "OPENAI_API_BASE": server.url,
+            "OPENAI_MODEL_NAME": "gpt-4o-mini",
+            "ANALYSIS_LLM": "stub",
+            "ANALYSIS_STUB_LATENCY": str(args.analysis_latency),
+            "QDRANT_URL": args.qdrant_url,
+        }
+    )
+    if not args.cache:
+        os.environ["RESPONSE_CACHE_SIZE"] = "0"
+
+    from crew import get_crew_response
+    from llm_clients import get_analysis_client
+    from resources import get_profile, get_qdrant_client
+
+    if args.qdrant_url == ":memory:":
+        # Embedded with the query model, so the agents' searches find meetings
+        meetings = generate_meetings(args.seed_meetings)
+        vectors = model_embedder()(
+            [meeting_text(m, m["vtt_content"]) for m in meetings]
+        )
+        ingest(
+            get_qdrant_client(),
+            get_profile(),
+            meetings,
+            vectors,
+            collection_name=COLLECTION_NAME,
+        )
+
+    queries = [
+        f"What did we discuss about {TOPICS[i % len(TOPICS)]}? (#{i})"
+        for i in range(args.queries)
+    ]
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            key: str(value) if isinstance(value, Path) else value
+            for key, value in vars(args).items()
+        },
+        "memory_mb_at_start": rss_mb(),
+        "results": [
+            run_level(
+                get_crew_response,
+                queries,
+                concurrency,
+                server,
+                get_analysis_client(),
+                args.analysis_latency,
+            )
+            for concurrency in args.concurrency
+        ],
+    }
+    server.stop()
+
+    output = args.output or RESULTS_DIR / (
+        f"crew-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(json.dumps(report["results"], indent=2))
+    print(f"LOG: Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import contextlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+from collection_profiles import SEARCH_PAYLOAD_FIELDS, VECTOR_SIZE
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+
+class LocalVectorIndex:
+    """
+    Exact cosine search over the normalized meeting vectors, kept in a memory-mapped
+    float32 matrix on disk next to the ids and search payloads of the points. It is
+    updated with every ingested batch and serves semantic search when Qdrant is
+    unreachable. Results are `ScoredPoint`s like those of `QdrantClient.search`.
+    """
+
+    def __init__(self, directory: Path, dim: int = VECTOR_SIZE):
+        self.directory = directory
+        self.dim = dim
+        self.vectors_path = directory / "vectors.f32"
+        self.points_path = directory / "points.json"
+        self._lock = threading.Lock()
+        self._ids: List[Any] = []
+        self._payloads: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+        self._matrix = np.empty((0, dim), dtype=np.float32)
+        # Nesting depth of deferred_save, and whether points are waiting to be saved
+        self._deferred = 0
+        self._unsaved = False
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _load(self):
+        try:
+            with open(self.points_path, "r") as f:
+                points = json.load(f)
+        except (OSError, ValueError):
+            return
+        row_bytes = self.dim * 4
+        # Vectors are written before the points, so the file may only have extra rows
+        if not self.vectors_path.exists() or (
+            self.vectors_path.stat().st_size < len(points["ids"]) * row_bytes
+        ):
+            print("LOG: Local vector index is incomplete, ignoring it")
+            return
+        self._ids = points["ids"]
+        self._payloads = points["payloads"]
+        self._rows = {str(point_id): row for row, point_id in enumerate(self._ids)}
+        self._map()
+        print(f"LOG: Loaded local vector index with {len(self._ids)} points")
+
+    def _map(self):
+        if self._ids:
+            self._matrix = np.memmap(
+                self.vectors_path,
+                dtype=np.float32,
+                mode="r",
+                shape=(len(self._ids), self.dim),
+            )
+        else:
+            self._matrix = np.empty((0, self.dim), dtype=np.float32)
+
+    def upsert(self, points: Iterable[Any]):
+        """Add or replace points with an id, vector and payload, e.g. `PointStruct`s."""
+        with self._lock:
+            # Copied, so searches keep a consistent view until the new rows are written
+            ids, payloads, rows = (
+                list(self._ids),
+                list(self._payloads),
+                dict(self._rows),
+            )
+            committed = len(ids)
+            writes = []
+            for point in points:
+                vector = np.asarray(point.vector, dtype=np.float32)
+                vector = vector / (np.linalg.norm(vector) or 1.0)
+                payload = {
+                    key: point.payload[key]
+                    for key in SEARCH_PAYLOAD_FIELDS
+                    if key in (point.payload or {})
+                }
+                row = rows.get(str(point.id))
+                if row is None:
+                    row = rows[str(point.id)] = len(ids)
+                    ids.append(point.id)
+                    payloads.append(payload)
+                else:
+                    payloads[row] = payload
+                writes.append((row, vector))
+            if not writes:
+                return
+
+            self.directory.mkdir(parents=True, exist_ok=True)
+            row_bytes = self.dim * 4
+            with open(self.vectors_path, "r+b" if committed else "wb") as f:
+                # Drop rows of an interrupted write that were never committed
+                f.truncate(committed * row_bytes)
+                for row, vector in writes:
+                    f.seek(row * row_bytes)
+                    f.write(vector.tobytes())
+
+            self._ids, self._payloads, self._rows = ids, payloads, rows
+            self._map()
+            if self._deferred:
+                self._unsaved = True
+            else:
+                self._save_points()
+
+    def _save_points(self):
+        """Commit the ids and payloads, and with them the rows written so far."""
+        temporary = self.points_path.with_suffix(".tmp")
+        with open(temporary, "w") as f:
+            json.dump({"ids": self._ids, "payloads": self._payloads}, f)
+        os.replace(temporary, self.points_path)
+        self._unsaved = False
+
+    @contextlib.contextmanager
+    def deferred_save(self) -> Iterator["LocalVectorIndex"]:
+        """
+        Save the ids and payloads once at the end of a bulk load, instead of rewriting
+        them after every upsert. Searches see the new points right away; after a crash
+        the index reverts to the last save, as the uncommitted rows are ignored.
+        """
+        with self._lock:
+            self._deferred += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._deferred -= 1
+                if not self._deferred and self._unsaved:
+                    self._save_points()
+
+    def clear(self):
+        with self._lock:
+            self.points_path.unlink(missing_ok=True)
+            self.vectors_path.unlink(missing_ok=True)
+            self._ids, self._payloads, self._rows = [], [], {}
+            self._map()
+
+    def rebuild_from(
+        self, client: QdrantClient, collection_name: str, batch_size: int = 256
+    ):
+        """Replace the index with the vectors and payloads of a Qdrant collection."""
+        print(f"LOG: Rebuilding local vector index from '{collection_name}'")
+        self.clear()
+        offset = None
+        with self.deferred_save():
+            while True:
+                records, offset = client.scroll(
+                    collection_name=collection_name,
+                    limit=batch_size,
+                    offset=offset,
+                    with_payload=SEARCH_PAYLOAD_FIELDS,
+                    with_vectors=True,
+                )
+                self.upsert(records)
+                if offset is None:
+                    break
+        print(f"LOG: Local vector index has {len(self)} points")
+
+    def search(
+        self,
+        query_vector: List[float],
+        limit: int = 10,
+        score_threshold: Optional[float] = None,
+        predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> List[models.ScoredPoint]:
+        """
+        Exact top-`limit` points by cosine similarity, optionally restricted to the
+        points whose payload satisfies `predicate`.
+        """
+        with self._lock:
+            matrix, ids, payloads = self._matrix, self._ids, self._payloads
+        if not ids:
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        scores = matrix @ (query / (np.linalg.norm(query) or 1.0))
+        if predicate is not None:
+            allowed = np.fromiter(
+                (predicate(payload) for payload in payloads), dtype=bool, count=len(ids)
+            )
+            scores = np.where(allowed, scores, -np.inf)
+        candidates = np.flatnonzero(
+            scores >= (score_threshold if score_threshold is not None else -1.0)
+        )
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit)[:limit]]
+        top = candidates[np.argsort(-scores[candidates])]
+        return [
+            models.ScoredPoint(
+                id=ids[row], version=0, score=float(scores[row]), payload=payloads[row]
+            )
+            for row in top
+        ]
@@ -0,0 +1,373 @@
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from analysis_store import AnalysisKey, AnalysisStore
+from llm_clients import message_text
+from tracing import in_current_context, record_usage, span
+
+ANALYSIS_MODEL = "claude-3-sonnet-20240229"
+
+# Bump whenever MEETING_PROMPT changes, so stored per-meeting analyses are not reused
+MEETING_PROMPT_VERSION = "2"
+
+# Length asked for each per-meeting analysis, and the output tokens it takes with its
+# JSON key and quoting. Batches of per-meeting analyses are sized so that all the
+# answers fit into max_tokens
+MEETING_ANALYSIS_WORDS = 100
+MEETING_ANALYSIS_TOKENS = 160
+
+ANALYSIS_PROMPT = """
+        Please analyze these meetings:
+
+        {meetings_text}
+
+        Provide:
+        1. Key discussion points across all meetings
+        2. Main decisions or action items
+        3. Overall patterns and insights
+        4. Notable participants and their contributions
+        5. Recommendations for follow-up
+        """
+
+MAP_PROMPT = """
+        Please analyze this batch of meetings. Your notes will later be merged with
+        the notes on other batches, so be concise and keep meeting topics and dates.
+
+        {meetings_text}
+
+        Provide:
+        1. Key discussion points
+        2. Decisions and action items
+        3. Notable participants and their contributions
+        """
+
+COMBINE_PROMPT = """
+        Below are {count} partial analyses of meetings. Combine them into a single
+        analysis. It will later be merged with other combined analyses, so be concise
+        and keep meeting topics and dates.
+
+        {partial_analyses}
+
+        Provide:
+        1. Key discussion points
+        2. Decisions and action items
+        3. Notable participants and their contributions
+        """
+
+REDUCE_PROMPT = """
+        Below are analyses of {batches} batches of meetings, {meetings} meetings in
+        total. Merge them into a single analysis of all the meetings:
+
+        {partial_analyses}
+
+        Provide:
+        1. Key discussion points across all meetings
+        2. Main decisions or action items
+        3. Overall patterns and insights
+        4. Notable participants and their contributions
+        5. Recommendations for follow-up
+        """
+
+
+MEETING_PROMPT = """
+        Please analyze each of these meetings separately:
+
+        {meetings_text}
+
+        For every meeting, give its key discussion points, decisions and action items,
+        and notable participants, in at most {words} words. Answer with a JSON object
+        only, mapping each meeting number (e.g. "1") to its analysis as a single string.
+        """
+
+SYNTHESIS_PROMPT = """
+        Below are analyses of {meetings} individual meetings. Synthesize them into a
+        single analysis of all the meetings:
+
+        {meeting_analyses}
+
+        Provide:
+        1. Key discussion points across all meetings
+        2. Main decisions or action items
+        3. Overall patterns and insights
+        4. Notable participants and their contributions
+        5. Recommendations for follow-up
+        """
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate, assuming about four characters per token."""
+    return len(text) // 4 + 1
+
+
+def format_meeting(number: int, meeting: Dict[str, Any]) -> str:
+    text = f"""Meeting {number}:
+            Topic: {meeting.get('topic')}
+            Start Time: {meeting.get('start_time')}
+            Duration: {meeting.get('duration')} minutes
+            Summary: {meeting.get('summary')}"""
+    # Digests computed at ingestion carry the key points, decisions and participants
+    if meeting.get("digest"):
+        text += f"""
+            Digest: {format_digest(meeting['digest'])}"""
+    return text
+
+
+def split_into_batches(
+    texts: List[str], token_budget: int, max_texts: Optional[int] = None
+) -> List[List[str]]:
+    """
+    Greedily group texts into batches of at most `token_budget` tokens, and of at most
+    `max_texts` texts. A text that does not fit the budget on its own is truncated and
+    put in a batch of its own.
+    """
+    batches, current, current_tokens = [], [], 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if tokens > token_budget:
+            text = text[: token_budget * 4]
+            tokens = token_budget
+        if current and (
+            current_tokens + tokens > token_budget
+            or (max_texts is not None and len(current) >= max_texts)
+        ):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def format_digest(digest: Union[Dict[str, List[str]], str]) -> str:
+    """
+    Render a meeting digest as compact text for prompts. Digests of packed search
+    results are already rendered, and are returned as they are.
+    """
+    if isinstance(digest, str):
+        return digest
+    return " | ".join(
+        f"{key.replace('_', ' ').capitalize()}: {'; '.join(values)}"
+        for key, values in digest.items()
+        if values
+    )
+
+
+def parse_json_object(text: str) -> Dict[str, Any]:
+    """Extract the JSON object from a model response, or an empty dict."""
+    try:
+        return json.loads(text[text.index("{") : text.rindex("}") + 1])
+    except ValueError:
+        return {}
+
+
+class MapReduceAnalyzer:
+    """
+    Analyze any number of meetings within the model context. Meetings are split into
+    token-budgeted batches, which are analyzed in parallel with bounded concurrency
+    (map), and the partial analyses are merged by a final call (reduce). Partial analyses
+    too large to merge at once are combined in tiers first. A set of meetings that fits
+    into a single batch is analyzed with one call, as before.
+
+    With a `store`, the map step produces per-meeting analyses that are persisted, and
+    later calls only analyze the meetings that are not stored yet before synthesizing.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        model: str = ANALYSIS_MODEL,
+        max_tokens: int = 1000,
+        batch_token_budget: int = 6000,
+        max_concurrency: int = 4,
+        store: Optional[AnalysisStore] = None,
+    ):
+        self.client = client
+        self.model = model
+        self.max_tokens = max_tokens
+        self.batch_token_budget = batch_token_budget
+        self.max_concurrency = max_concurrency
+        self.store = store
+
+    def _complete(self, prompt: str) -> str:
+        with span("llm.analysis", **{"gen_ai.request.model": self.model}) as llm_span:
+            message = self.client.messages.create(
+                model=self.model,
+                max_tokens=self.max_tokens,
+                temperature=0,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            usage = getattr(message, "usage", None)
+            if usage is not None:
+                record_usage(llm_span, usage.input_tokens, usage.output_tokens)
+        return message_text(message)
+
+    def _map(self, batch: List[str]) -> str:
+        return self._complete(MAP_PROMPT.format(meetings_text="\n\n".join(batch)))
+
+    def _combine(self, partials: List[str]) -> str:
+        return self._complete(
+            COMBINE_PROMPT.format(
+                count=len(partials), partial_analyses="\n\n".join(partials)
+            )
+        )
+
+    def _reduce(
+        self, partials: List[str], final_prompt: Callable[[str], str]
+    ) -> Tuple[str, int]:
+        """
+        Merge partial analyses with a final call built by `final_prompt`. While they do
+        not fit into `batch_token_budget` together, they are first combined in tiers of
+        parallel calls. Returns the analysis and the number of tiers.
+        """
+        tiers = 0
+        while (
+            len(partials) > 1
+            and sum(estimate_tokens(p) for p in partials) > self.batch_token_budget
+        ):
+            # Capped at half the budget, so every group merges at least two partials
+            groups = split_into_batches(
+                [p[: (self.batch_token_budget // 2 - 1) * 4] for p in partials],
+                self.batch_token_budget,
+            )
+            tiers += 1
+            print(
+                f"LOG: Combining {len(partials)} partial analyses into "
+                f"{len(groups)} (tier {tiers})"
+            )
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                partials = list(executor.map(in_current_context(self._combine), groups))
+        text = "\n\n".join(partials)[: self.batch_token_budget * 4]
+        return self._complete(final_prompt(text)), tiers
+
+    def _meeting_key(self, meeting: Dict[str, Any]) -> AnalysisKey:
+        content = format_meeting(0, meeting)
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        meeting_id = str(meeting.get("id") or meeting.get("uuid") or content_hash)
+        return meeting_id, content_hash, MEETING_PROMPT_VERSION, self.model
+
+    def _map_meetings(self, meetings: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """Analyze each of the meetings, None for those the model did not answer for."""
+        batch = [
+            format_meeting(n + 1, meeting)[: self.batch_token_budget * 4]
+            for n, meeting in enumerate(meetings)
+        ]
+        response = self._complete(
+            MEETING_PROMPT.format(
+                meetings_text="\n\n".join(batch), words=MEETING_ANALYSIS_WORDS
+            )
+        )
+        result = parse_json_object(response)
+        analyses = [result.get(str(n + 1)) for n in range(len(meetings))]
+        return [str(analysis) if analysis else None for analysis in analyses]
+
+    def _analyze_with_store(self, meetings: List[Dict[str, Any]]) -> Dict[str, Any]:
+        keys = [self._meeting_key(m) for m in meetings]
+        with span("analysis_store.get_many", **{"analysis.meetings": len(keys)}):
+            analyses = self.store.get_many(keys)
+        missing = [i for i, key in enumerate(keys) if key not in analyses]
+        print(
+            f"LOG: Reusing {len(meetings) - len(missing)} stored meeting analyses, "
+            f"analyzing {len(missing)} meetings"
+        )
+        reused = len(meetings) - len(missing)
+
+        # Batches are bounded by the input budget, and by the number of analyses that
+        # fit into the answer. Meetings left out of an answer, e.g. because it was cut
+        # off, are asked for again together, in smaller batches
+        meetings_per_batch = max(1, self.max_tokens // MEETING_ANALYSIS_TOKENS)
+        batch_count = 0
+        new_analyses = {}
+        while missing:
+            index_batches = self._index_batches(meetings, missing, meetings_per_batch)
+            batch_count += len(index_batches)
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                batch_results = list(
+                    executor.map(
+                        in_current_context(self._map_meetings),
+                        [[meetings[i] for i in ids] for ids in index_batches],
+                    )
+                )
+            for ids, result in zip(index_batches, batch_results):
+                for i, analysis in zip(ids, result):
+                    if analysis:
+                        new_analyses[keys[i]] = analysis
+            missing = [i for i in missing if keys[i] not in new_analyses]
+            if not missing or meetings_per_batch == 1:
+                break
+            meetings_per_batch = max(1, meetings_per_batch // 2)
+            print(
+                f"LOG: {len(missing)} meetings were not analyzed, asking again in "
+                f"batches of up to {meetings_per_batch}"
+            )
+        if new_analyses:
+            self.store.put_many(new_analyses)
+            analyses.update(new_analyses)
+
+        result = {
+            "batches": batch_count,
+            "reused_analyses": reused,
+            "reduce_tiers": 0,
+        }
+        if len(meetings) == 1 and keys[0] in analyses:
+            # Nothing to synthesize across
+            return {**result, "analysis": analyses[keys[0]]}
+
+        # Meetings the model did not answer for are synthesized from their raw data
+        analysis, tiers = self._reduce(
+            [
+                f"Meeting {i + 1} ({m.get('topic')}, {m.get('start_time')}):\n"
+                + analyses.get(keys[i], format_meeting(i + 1, m))
+                for i, m in enumerate(meetings)
+            ],
+            lambda text: SYNTHESIS_PROMPT.format(
+                meetings=len(meetings), meeting_analyses=text
+            ),
+        )
+        return {**result, "reduce_tiers": tiers, "analysis": analysis}
+
+    def _index_batches(
+        self, meetings: List[Dict[str, Any]], indices: List[int], max_meetings: int
+    ) -> List[List[int]]:
+        """Split the meetings at `indices` into batches, as lists of their indices."""
+        batches = split_into_batches(
+            [format_meeting(0, meetings[i]) for i in indices],
+            self.batch_token_budget,
+            max_meetings,
+        )
+        index_batches, start = [], 0
+        for batch in batches:
+            index_batches.append(indices[start : start + len(batch)])
+            start += len(batch)
+        return index_batches
+
+    def analyze(self, meetings: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if self.store is not None:
+            return self._analyze_with_store(meetings)
+
+        texts = [format_meeting(i + 1, m) for i, m in enumerate(meetings)]
+        batches = split_into_batches(texts, self.batch_token_budget)
+        if len(batches) <= 1:
+            analysis = self._complete(
+                ANALYSIS_PROMPT.format(meetings_text="\n\n".join(texts))
+            )
+            return {"batches": len(batches), "analysis": analysis}
+
+        print(f"LOG: Analyzing {len(meetings)} meetings in {len(batches)} batches")
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            partial_analyses = list(
+                executor.map(in_current_context(self._map), batches)
+            )
+
+        analysis, tiers = self._reduce(
+            [
+                f"Batch {i + 1}:\n{partial}"
+                for i, partial in enumerate(partial_analyses)
+            ],
+            lambda text: REDUCE_PROMPT.format(
+                batches=len(batches), meetings=len(meetings), partial_analyses=text
+            ),
+        )
+        return {"batches": len(batches), "reduce_tiers": tiers, "analysis": analysis}
@@ -0,0 +1,189 @@
+import ast
+import operator
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+# Words a statistical query may consist of. Any other word (e.g. a topic) means the
+# query needs search or analysis and is left to the crew.
+STATISTIC_WORDS = {
+    "average": "average",
+    "mean": "average",
+    "total": "total",
+    "sum": "total",
+    "count": "count",
+    "many": "count",
+    "number": "count",
+    "longest": "longest",
+    "shortest": "shortest",
+}
+FILLER_WORDS = {
+    "a", "across", "all", "an", "are", "by", "calculate", "did", "do", "does",
+    "duration", "durations", "for", "give", "has", "have", "how", "hours", "in",
+    "is", "length", "long", "me", "meeting", "meetings", "minutes", "much", "my",
+    "of", "our", "per", "recorded", "recording", "recordings", "s", "show", "spent",
+    "statistics", "tell", "the", "there", "time", "was", "we", "were", "what",
+    "whats", "which",
+}  # fmt: skip
+
+ARITHMETIC_PREFIX = re.compile(
+    r"^(what is|what's|whats|calculate|compute|how much is)\s+", re.IGNORECASE
+)
+ARITHMETIC_EXPRESSION = re.compile(r"^[\d\s.+\-*/()%]+$")
+LOOKUP_PATTERN = re.compile(
+    r"^(?:find|show|list|search)(?: me)?(?: all)?(?: the)? meetings?"
+    r" (?:about|on|regarding|related to|discussing) (?P<topic>.+)$",
+    re.IGNORECASE,
+)
+
+OPERATORS: Dict[type, Callable] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+
+def _evaluate(node: ast.AST) -> float:
+    """Evaluate a parsed arithmetic expression, allowing numbers and operators only."""
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in OPERATORS:
+        return OPERATORS[type(node.op)](_evaluate(node.left), _evaluate(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in OPERATORS:
+        return OPERATORS[type(node.op)](_evaluate(node.operand))
+    raise ValueError("Unsupported expression")
+
+
+def answer_arithmetic(query: str) -> Optional[str]:
+    """Answer queries like "what is 12 * 7" without an LLM."""
+    expression = ARITHMETIC_PREFIX.sub("", query.strip()).rstrip("?=. ")
+    if not re.search(r"\d", expression) or not ARITHMETIC_EXPRESSION.match(expression):
+        return None
+    try:
+        result = _evaluate(ast.parse(expression, mode="eval"))
+    except (SyntaxError, ValueError, ZeroDivisionError):
+        return None
+    if isinstance(result, float) and result.is_integer():
+        result = int(result)
+    return f"{expression.strip()} = {result}"
+
+
+def _user_name(user: Dict[str, Any]) -> str:
+    return f"{user.get('firstname') or ''} {user.get('lastname') or ''}".strip()
+
+
+def _query_words(query: str) -> List[str]:
+    # Drop possessives and apostrophes, so "Jane's" and "what's" match plain words
+    return re.findall(
+        r"[a-z0-9@._-]+", re.sub(r"'s\b", " ", query.lower()).replace("'", "")
+    )
+
+
+def answer_statistics(query: str, meetings: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Answer statistical questions about meeting durations from the loaded metadata,
+    optionally restricted to a single user mentioned by name or email.
+    """
+    words = _query_words(query)
+    statistics = {STATISTIC_WORDS[w] for w in words if w in STATISTIC_WORDS}
+    if len(statistics) != 1:
+        return None
+
+    # Restrict to a user if the query mentions one
+    user_words, selected = set(), meetings
+    for meeting in meetings:
+        user = meeting.get("user") or {}
+        names = {
+            (user.get("firstname") or "").lower(),
+            (user.get("lastname") or "").lower(),
+            (user.get("email") or "").lower(),
+        } - {""}
+        if names & set(words):
+            user_words |= names
+            selected = [m for m in meetings if m.get("user") == user]
+            break
+
+    if set(words) - STATISTIC_WORDS.keys() - FILLER_WORDS - user_words:
+        return None
+    if not selected:
+        return "No meetings found."
+
+    scope = f" for {_user_name(selected[0]['user'])}" if user_words else ""
+    durations = [m.get("duration") or 0 for m in selected]
+    statistic = statistics.pop()
+    if statistic == "average":
+        return (
+            f"The average meeting duration{scope} is "
+            f"{sum(durations) / len(durations):.2f} minutes "
+            f"across {len(selected)} meetings."
+        )
+    if statistic == "total":
+        return (
+            f"The total meeting duration{scope} is {sum(durations)} minutes "
+            f"across {len(selected)} meetings."
+        )
+    if statistic == "count":
+        return f"There are {len(selected)} meetings{scope}."
+
+    pick = max if statistic == "longest" else min
+    meeting = pick(selected, key=lambda m: m.get("duration") or 0)
+    return (
+        f"The {statistic} meeting{scope} is '{meeting.get('topic')}' "
+        f"on {meeting.get('start_time')}, lasting {meeting.get('duration')} minutes."
+    )
+
+
+def answer_lookup(
+    query: str, search: Callable[[str], List[Dict[str, Any]]]
+) -> Optional[str]:
+    """Answer "find meetings about X" with a list of search results."""
+    match = LOOKUP_PATTERN.match(query.strip().rstrip("?."))
+    if not match:
+        return None
+    results = search(match.group("topic"))
+    if not results:
+        return None
+    lines = [f"Meetings about {match.group('topic')}:"]
+    for result in results:
+        lines.append(
+            f"- **{result.get('topic')}** ({result.get('start_time')}, "
+            f"{result.get('duration')} minutes): {result.get('summary')}"
+        )
+    return "\n".join(lines)
+
+
+def route_query(
+    query: str,
+    meeting_data_factory: Callable[[], Any],
+    search: Callable[[str, int], List[Dict[str, Any]]],
+    search_limit: int = 10,
+) -> Optional[str]:
+    """
+    Answer arithmetic, statistical and lookup queries directly. Returns None for any
+    other query, which should go through the full crew. `meeting_data_factory` is only
+    called when a statistical query needs the meeting metadata, and lookups return up
+    to `search_limit` meetings from `search(topic, limit)`.
+    """
+    answer = answer_arithmetic(query)
+    if answer is not None:
+        print("LOG: Routed query to the arithmetic fast path")
+        return answer
+
+    if STATISTIC_WORDS.keys() & set(_query_words(query)):
+        answer = answer_statistics(query, meeting_data_factory().meetings)
+        if answer is not None:
+            print("LOG: Routed query to the statistics fast path")
+            return answer
+
+    if LOOKUP_PATTERN.match(query.strip()):
+        answer = answer_lookup(query, lambda topic: search(topic, search_limit))
+        if answer is not None:
+            print("LOG: Routed query to the lookup fast path")
+            return answer
+
+    return None
@@ -0,0 +1,96 @@
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from qdrant_client.http import models
+
+
+def recency_half_life_days() -> float:
+    """Age at which a meeting gets half of the recency boost, RECENCY_HALF_LIFE_DAYS."""
+    return float(os.getenv("RECENCY_HALF_LIFE_DAYS", 30))
+
+
+def recency_weight() -> float:
+    """
+    Size of the full boost added to the cosine similarity of a brand new meeting,
+    RECENCY_WEIGHT.
+    """
+    return float(os.getenv("RECENCY_WEIGHT", 0.25))
+
+
+def recency_prefetch_factor() -> int:
+    """
+    Candidates retrieved by similarity per returned hit, before they are rescored,
+    RECENCY_PREFETCH_FACTOR.
+    """
+    return int(os.getenv("RECENCY_PREFETCH_FACTOR", 5))
+
+
+# Meetings without a start time are treated as very old, so they get no boost
+_UNDATED = "1970-01-01T00:00:00Z"
+
+
+def recency_formula(
+    now: Optional[datetime] = None,
+    half_life_days: Optional[float] = None,
+    weight: Optional[float] = None,
+) -> models.FormulaQuery:
+    """
+    Score formula adding an exponentially decaying recency boost to the similarity:
+    `score + weight * 0.5 ** (age / half_life)`, with the age of the meeting taken from
+    the `start_time` payload relative to `now`.
+    """
+    now = now or datetime.now(timezone.utc)
+    half_life_days = half_life_days or recency_half_life_days()
+    weight = recency_weight() if weight is None else weight
+    return models.FormulaQuery(
+        formula=models.SumExpression(
+            sum=[
+                "$score",
+                models.MultExpression(
+                    mult=[
+                        weight,
+                        models.ExpDecayExpression(
+                            exp_decay=models.DecayParamsExpression(
+                                x=models.DatetimeKeyExpression(
+                                    datetime_key="start_time"
+                                ),
+                                target=models.DatetimeExpression(
+                                    datetime=now.isoformat()
+                                ),
+                                scale=half_life_days * 86400,
+                                midpoint=0.5,
+                            )
+                        ),
+                    ]
+                ),
+            ]
+        ),
+        defaults={"start_time": _UNDATED},
+    )
+
+
+def recency_query(
+    query_vector: List[float],
+    limit: int,
+    score_threshold: Optional[float] = None,
+    query_filter: Optional[models.Filter] = None,
+    search_params: Optional[models.SearchParams] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Arguments of a `query_points` request ranking the meetings by recency-boosted
+    similarity. The candidates are retrieved and filtered by similarity, then rescored
+    by Qdrant with `recency_formula`, so a single request returns the final top hits.
+    """
+    return {
+        "prefetch": models.Prefetch(
+            query=query_vector,
+            limit=limit * recency_prefetch_factor(),
+            score_threshold=score_threshold,
+            filter=query_filter,
+            params=search_params,
+        ),
+        "query": recency_formula(now),
+        "limit": limit,
+    }
@@ -0,0 +1,265 @@
+import argparse
+import contextlib
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from collection_profiles import COLLECTION_NAME, create_collection
+from data_loader import (
+    PAYLOAD_INDEXES,
+    TRANSCRIPT_CACHE_DIR,
+    TranscriptStore,
+    load_meetings,
+    meeting_point,
+    meeting_text,
+)
+from embeddings import EMBEDDING_MODEL_NAME, Embedder, embedding_backend
+from qdrant_client.http import models
+from resources import get_local_index, get_profile, get_qdrant_client
+from upsert_writer import UpsertWriter
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+CHECKPOINT_PATH = (
+    Path(__file__).parent.parent / ".cache" / "reindex" / "checkpoint.json"
+)
+
+# Environment variables read by the math libraries when they start their thread pools
+THREAD_LIMIT_VARIABLES = [
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+]
+
+# State of an embedding worker process, created by _init_worker
+_worker: Dict[str, Any] = {}
+
+
+@contextlib.contextmanager
+def thread_limits(threads: int):
+    """
+    Limit the threads of the math libraries in the processes started in this context.
+    The libraries read the limits when they are imported, which a spawned worker does
+    while it re-imports this module, before its initializer runs, so the limits are set
+    in the environment the workers inherit.
+    """
+    limits = {variable: str(threads) for variable in THREAD_LIMIT_VARIABLES}
+    limits["TOKENIZERS_PARALLELISM"] = "false"
+    previous = {variable: os.environ.get(variable) for variable in limits}
+    os.environ.update(limits)
+    try:
+        yield
+    finally:
+        for variable, value in previous.items():
+            if value is None:
+                os.environ.pop(variable, None)
+            else:
+                os.environ[variable] = value
+
+
+def _init_worker(threads: int, backend: str):
+    """Load the embedding model once per worker process."""
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker["embedder"] = Embedder(backend)
+    _worker["transcripts"] = TranscriptStore(TRANSCRIPT_CACHE_DIR)
+
+
+def _embed_batch(
+    index: int, meetings: List[Dict[str, Any]]
+) -> Tuple[int, List[models.PointStruct]]:
+    """Build the points of one batch of meetings in a worker process."""
+    transcripts = [_worker["transcripts"].read(m.get("_transcript")) for m in meetings]
+    vectors = _worker["embedder"].encode(
+        [meeting_text(m, t) for m, t in zip(meetings, transcripts)]
+    )
+    return index, [
+        meeting_point(meeting, transcript, vector.tolist())
+        for meeting, transcript, vector in zip(meetings, transcripts, vectors)
+    ]
+
+
+def fingerprint(meetings: List[Dict[str, Any]], batch_size: int) -> str:
+    """Identify a re-index run, so a checkpoint is only resumed for the same input."""
+    digest = hashlib.sha256(f"{COLLECTION_NAME}:{batch_size}".encode("utf-8"))
+    for meeting in meetings:
+        key = (
+            meeting.get("uuid") or f"{meeting.get('topic')}@{meeting.get('start_time')}"
+        )
+        digest.update(key.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_checkpoint(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_checkpoint(path: Path, checkpoint: Dict[str, Any]):
+    """Write the checkpoint atomically, so an interrupted run never leaves it corrupt."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(".tmp")
+    with open(temporary, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(temporary, path)
+
+
+def _recreate_collection(client):
+    if client.collection_exists(COLLECTION_NAME):
+        print(f"LOG: Deleting collection '{COLLECTION_NAME}'")
+        client.delete_collection(COLLECTION_NAME)
+    profile = get_profile()
+    print(
+        f"LOG: Creating collection '{COLLECTION_NAME}' with the '{profile.name}' profile"
+    )
+    create_collection(client, COLLECTION_NAME, profile)
+    for field_name, field_schema in PAYLOAD_INDEXES.items():
+        client.create_payload_index(COLLECTION_NAME, field_name, field_schema)
+    get_local_index().clear()
+
+
+def reindex(
+    workers: int,
+    threads_per_worker: int = 1,
+    batch_size: int = 64,
+    checkpoint_path: Path = CHECKPOINT_PATH,
+    fresh: bool = False,
+) -> Dict[str, Any]:
+    """
+    Rebuild the meetings collection with a pool of embedding worker processes. Batches
+    are embedded out of order and upserted in order by this process, the single writer,
+    which checkpoints after every batch so an interrupted run resumes where it stopped.
+    """
+    meetings = load_meetings(DATA_DIR)
+    batches = [
+        meetings[i : i + batch_size] for i in range(0, len(meetings), batch_size)
+    ]
+    run_id = fingerprint(meetings, batch_size)
+    client = get_qdrant_client()
+
+    checkpoint = None if fresh else load_checkpoint(checkpoint_path)
+    if (
+        checkpoint
+        and checkpoint.get("fingerprint") == run_id
+        and client.collection_exists(COLLECTION_NAME)
+    ):
+        start = checkpoint["completed_batches"]
+        print(f"LOG: Resuming from batch {start + 1} of {len(batches)}")
+    else:
+        start = 0
+        _recreate_collection(client)
+
+    writer = UpsertWriter(client, COLLECTION_NAME)
+    if start == 0:
+        # The queued points are in the new collection's input as well
+        writer.retry_queue.clear()
+    else:
+        writer.replay()
+
+    backend = embedding_backend()
+    print(
+        f"LOG: Re-indexing {len(meetings)} meetings with {workers} workers, "
+        f"{threads_per_worker} threads each, on the {backend} backend"
+    )
+    started = time.perf_counter()
+    written = queued = 0
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        # Spawned workers start without the parent's thread pools and model state
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(threads_per_worker, backend),
+    )
+    local_index = get_local_index()
+    # The workers are started on demand, so the limits are kept for the pool's lifetime,
+    # and the local index is saved once at the end, instead of after every batch
+    with thread_limits(threads_per_worker), pool, local_index.deferred_save():
+        futures = set()
+        embedded: Dict[int, List[models.PointStruct]] = {}
+        next_submit = next_write = start
+        while next_write < len(batches):
+            # Bound the batches ahead of the writer, which bounds memory use
+            while next_submit < len(batches) and next_submit - next_write < 2 * workers:
+                futures.add(
+                    pool.submit(_embed_batch, next_submit, batches[next_submit])
+                )
+                next_submit += 1
+
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, points = future.result()
+                embedded[index] = points
+
+            while next_write in embedded:
+                points = embedded.pop(next_write)
+                # Failed points are durably queued, so the batch can be checkpointed
+                stats = writer.write(points)
+                written += stats["written"]
+                queued += stats["queued"]
+                local_index.upsert(points)
+                next_write += 1
+                save_checkpoint(
+                    checkpoint_path,
+                    {
+                        "fingerprint": run_id,
+                        "completed_batches": next_write,
+                        "total_batches": len(batches),
+                        "model": EMBEDDING_MODEL_NAME,
+                    },
+                )
+                print(f"LOG: Inserted batch {next_write} of {len(batches)}")
+
+    if start > 0:
+        # Batches of the interrupted run may not have been saved to the local index
+        local_index.rebuild_from(client, COLLECTION_NAME)
+    seconds = time.perf_counter() - started
+    checkpoint_path.unlink(missing_ok=True)
+    print("LOG: Re-index complete")
+    return {
+        "meetings": len(meetings),
+        "written": written,
+        "queued_for_retry": queued,
+        "resumed_from_batch": start,
+        "seconds": round(seconds, 3),
+        "meetings_per_second": round(written / seconds, 1) if seconds else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(
+        description="Rebuild the meetings collection with parallel embedding workers"
+    )
+    parser.add_argument("--workers", type=int, default=cpus)
+    parser.add_argument(
+        "--threads-per-worker",
+        type=int,
+        help="Math library threads of each worker, by default the cores per worker",
+    )
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--checkpoint", type=Path, default=CHECKPOINT_PATH)
+    parser.add_argument(
+        "--fresh", action="store_true", help="Ignore the checkpoint and start over"
+    )
+    args = parser.parse_args()
+
+    result = reindex(
+        workers=args.workers,
+        threads_per_worker=args.threads_per_worker or max(1, cpus // args.workers),
+        batch_size=args.batch_size,
+        checkpoint_path=args.checkpoint,
+        fresh=args.fresh,
+    )
+    print(json.dumps(result, indent=2))
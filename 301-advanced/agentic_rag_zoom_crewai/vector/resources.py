@@ -0,0 +1,182 @@
+import functools
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from analysis_store import AnalysisStore
+from async_search import AsyncMeetingSearch
+from collection_profiles import (
+    COLLECTION_NAME,
+    CollectionProfile,
+    get_collection_profile,
+)
+from dotenv import load_dotenv
+from embeddings import Embedder
+from local_index import LocalVectorIndex
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from response_cache import SemanticResponseCache
+from tracing import traced
+
+# Load environment variables from .env.local
+env_path = Path(__file__).parent.parent / ".env.local"
+load_dotenv(env_path)
+
+# Seconds each resource took to load, for the health report
+_load_times: Dict[str, float] = {}
+
+
+def _shared_resource(name: str):
+    """Cache a resource getter, so the resource is created once per process."""
+
+    def decorator(getter):
+        @functools.lru_cache(maxsize=None)
+        @functools.wraps(getter)
+        def wrapper():
+            start = time.perf_counter()
+            resource = getter()
+            _load_times[name] = time.perf_counter() - start
+            return resource
+
+        return wrapper
+
+    return decorator
+
+
+def qdrant_settings() -> Tuple[Optional[str], Optional[str]]:
+    """
+    Qdrant URL and API key from QDRANT_URL and QDRANT_API_KEY, falling back to the
+    older qdrantUrl and qdrantApiKey names.
+    """
+    return (
+        os.getenv("QDRANT_URL") or os.getenv("qdrantUrl"),
+        os.getenv("QDRANT_API_KEY") or os.getenv("qdrantApiKey"),
+    )
+
+
+def qdrant_client_options() -> Dict[str, Any]:
+    """
+    Arguments of both the sync and the async Qdrant client. QDRANT_URL=:memory: runs
+    Qdrant in-process, e.g. for load tests.
+    """
+    url, api_key = qdrant_settings()
+    if url == ":memory:":
+        return {"location": ":memory:"}
+    return {"url": url, "api_key": api_key}
+
+
+@_shared_resource("qdrant_client")
+def get_qdrant_client() -> QdrantClient:
+    return QdrantClient(**qdrant_client_options())
+
+
+@_shared_resource("embedding_model")
+def get_embedding_model() -> Embedder:
+    """The embedding model for meetings and queries, on the EMBEDDING_BACKEND."""
+    return Embedder()
+
+
+@_shared_resource("collection_profile")
+def get_profile() -> CollectionProfile:
+    return get_collection_profile()
+
+
+@_shared_resource("async_search")
+def get_async_search() -> AsyncMeetingSearch:
+    options = qdrant_client_options()
+    if options.get("location") == ":memory:":
+        # Each in-memory client has its own storage, so the meetings loaded through
+        # the sync client are searched through it, in a worker thread
+        qdrant_client = get_qdrant_client()
+    else:
+        qdrant_client = AsyncQdrantClient(**options)
+    return AsyncMeetingSearch(
+        profile=get_profile(),
+        embedder=get_embedding_model(),
+        qdrant_client=qdrant_client,
+    )
+
+
+@_shared_resource("response_cache")
+def get_response_cache() -> SemanticResponseCache:
+    return SemanticResponseCache(
+        embed=traced("embedding")(get_embedding_model().encode),
+        similarity_threshold=float(os.getenv("RESPONSE_CACHE_SIMILARITY", 0.95)),
+        ttl=float(os.getenv("RESPONSE_CACHE_TTL", 3600)),
+        max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", 256)),
+    )
+
+
+@_shared_resource("analysis_store")
+def get_analysis_store() -> AnalysisStore:
+    return AnalysisStore(
+        Path(
+            os.getenv(
+                "ANALYSIS_STORE_PATH",
+                Path(__file__).parent.parent / ".cache" / "analyses.sqlite3",
+            )
+        )
+    )
+
+
+@_shared_resource("local_index")
+def get_local_index() -> LocalVectorIndex:
+    """Exact-search copy of the collection, used when Qdrant is unreachable."""
+    return LocalVectorIndex(
+        Path(
+            os.getenv(
+                "LOCAL_INDEX_DIR",
+                Path(__file__).parent.parent / ".cache" / "local_index",
+            )
+        )
+    )
+
+
+RESOURCE_GETTERS = {
+    "qdrant_client": get_qdrant_client,
+    "embedding_model": get_embedding_model,
+    "collection_profile": get_profile,
+    "async_search": get_async_search,
+    "response_cache": get_response_cache,
+    "analysis_store": get_analysis_store,
+    "local_index": get_local_index,
+}
+
+
+def is_loaded(name: str) -> bool:
+    """Whether the named resource has been created in this process."""
+    return RESOURCE_GETTERS[name].cache_info().currsize > 0
+
+
+def warm_up():
+    """Create all the shared resources and run one embedding to load the model."""
+    for getter in RESOURCE_GETTERS.values():
+        getter()
+    get_embedding_model().encode("warm up")
+
+
+def health() -> Dict[str, Dict[str, Any]]:
+    """Which shared resources are loaded, and how long they took to load."""
+    report = {
+        name: {
+            "loaded": is_loaded(name),
+            "load_seconds": round(_load_times[name], 3)
+            if name in _load_times
+            else None,
+        }
+        for name in RESOURCE_GETTERS
+    }
+    if is_loaded("local_index"):
+        report["local_index"]["points"] = len(get_local_index())
+    if not is_loaded("qdrant_client"):
+        return report
+    try:
+        collection = get_qdrant_client().get_collection(COLLECTION_NAME)
+        report["qdrant_collection"] = {
+            "loaded": True,
+            "points": collection.points_count,
+            "status": str(collection.status),
+        }
+    except Exception as e:
+        report["qdrant_collection"] = {"loaded": False, "error": str(e)}
+    return report
@@ -0,0 +1,108 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+
+@dataclass
+class _CacheEntry:
+    query: str
+    scope: str
+    embedding: np.ndarray
+    response: Any
+    created_at: float
+
+
+class SemanticResponseCache:
+    """
+    Thread-safe LRU cache of crew responses. A query hits the cache if its normalized
+    text was seen before, or if its embedding is at least `similarity_threshold` cosine
+    similar to a cached one. Entries expire after `ttl` seconds. Responses are only
+    shared between queries of the same `scope`, e.g. the same execution settings.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], np.ndarray],
+        similarity_threshold: float = 0.95,
+        ttl: float = 3600,
+        max_entries: int = 256,
+    ):
+        self.embed = embed
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Lowercase the query, collapse whitespace and drop surrounding punctuation."""
+        return re.sub(r"\s+", " ", query.lower()).strip(" ?!.,;:'\"")
+
+    def _embed(self, query: str) -> np.ndarray:
+        embedding = np.asarray(self.embed(query), dtype=np.float32)
+        return embedding / (np.linalg.norm(embedding) or 1.0)
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for key in [
+            k for k, e in self._entries.items() if now - e.created_at > self.ttl
+        ]:
+            del self._entries[key]
+
+    def _key(self, query: str, scope: str) -> str:
+        normalized = self.normalize(query)
+        return f"[{scope}] {normalized}" if scope else normalized
+
+    def get(self, query: str, scope: str = "") -> Optional[Any]:
+        """Return the cached response for the query or a near-duplicate of it."""
+        key = self._key(query, scope)
+        with self._lock:
+            self._evict_expired()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                print(f"LOG: Response cache hit for query: {query}")
+                return self._entries[key].response
+            if not any(e.scope == scope for e in self._entries.values()):
+                return None
+
+        embedding = self._embed(self.normalize(query))
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if e.scope == scope]
+            if not keys:
+                return None
+            matrix = np.stack([self._entries[k].embedding for k in keys])
+            similarities = matrix @ embedding
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.similarity_threshold:
+                return None
+            self._entries.move_to_end(keys[best])
+            print(
+                f"LOG: Response cache hit for query: {query} "
+                f"(similar to '{keys[best]}', {similarities[best]:.3f})"
+            )
+            return self._entries[keys[best]].response
+
+    def put(self, query: str, response: Any, scope: str = ""):
+        """Store the response, evicting the least recently used entries if needed."""
+        key = self._key(query, scope)
+        normalized = self.normalize(query)
+        entry = _CacheEntry(
+            normalized, scope, self._embed(normalized), response, time.monotonic()
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """Drop all the cached responses, e.g. after new meetings were ingested."""
+        with self._lock:
+            self._entries.clear()
+        print("LOG: Response cache invalidated")
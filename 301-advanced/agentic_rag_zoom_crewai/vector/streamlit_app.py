@@ -1,9 +1,7 @@
-import contextlib
-import sys
-import time
-
 import streamlit as st
-from crew import get_crew_response
+from crew import health_report, warm_up
+from crew_jobs import CrewJob
+from execution_profiles import get_execution_profile
 
 # Set page config
 st.set_page_config(page_title="Meeting Assistant", page_icon="🤖", layout="wide")
@@ -36,88 +34,95 @@ This assistant can help you:
 - Perform calculations related to meetings
 """)
 
+
+@st.cache_resource(show_spinner="Loading models and meeting data...")
+def load_resources() -> bool:
+    """Warm up the shared models, clients and meeting data once per server process."""
+    warm_up()
+    return True
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_health_report():
+    return health_report()
+
+
+try:
+    load_resources()
+except Exception as e:
+    st.error(f"Error loading resources: {str(e)}")
+
+# Add a sidebar with additional controls if needed
+with st.sidebar:
+    st.header("Settings")
+
+    # Retrieval and analysis settings of each new question
+    st.subheader("Search Settings")
+    search_limit = st.slider("Number of results", 1, 10, 5)
+
+    st.subheader("Analysis Settings")
+    analysis_depth = st.select_slider(
+        "Analysis Depth", options=["Basic", "Standard", "Detailed"], value="Standard"
+    )
+
+    # Add a clear chat button
+    if st.button(
+        "Clear Chat History", disabled=st.session_state.get("job") is not None
+    ):
+        st.session_state.messages = []
+        st.rerun()
+
+    # Show what is loaded
+    with st.expander("System Health"):
+        for name, status in get_health_report().items():
+            icon = "✅" if status.get("loaded") else "⚪"
+            details = ", ".join(
+                f"{key}: {value}"
+                for key, value in status.items()
+                if key != "loaded" and value is not None
+            )
+            st.markdown(f"{icon} **{name}** {details}")
+
+    # Add version info
+    st.markdown("---")
+    st.markdown("v1.0.0")
+
 # Create tabs
 tab1, tab2 = st.tabs(["Chat Interface", "About"])
 
 
-# Add this function to show processing steps
-def show_processing_steps():
-    steps = [
-        (
-            "🔍 Research Phase",
-            [
-                "Analyzing query intent...",
-                "Searching through meeting recordings...",
-                "Collecting relevant information...",
-            ],
-        ),
-        (
-            "🧠 Analysis Phase",
-            [
-                "Processing search results...",
-                "Analyzing meeting content...",
-                "Extracting key insights...",
-            ],
-        ),
-        (
-            "📝 Synthesis Phase",
-            [
-                "Combining information...",
-                "Formatting response...",
-                "Preparing final answer...",
-            ],
-        ),
-    ]
-
-    progress_placeholder = st.empty()
-    steps_placeholder = st.empty()
-
-    for i, (phase, substeps) in enumerate(steps):
-        progress = (i + 1) / len(steps)
-        progress_placeholder.progress(progress)
-
-        with steps_placeholder.container():
-            st.markdown(f"**Current Phase: {phase}**")
-            for substep in substeps:
-                time.sleep(0.5)  # Add small delay for visual effect
-                st.markdown(f"- {substep}")
-
-        time.sleep(1)  # Pause between phases
-
-    progress_placeholder.empty()
-    steps_placeholder.empty()
-
-
-class ConsoleOutput:
-    def __init__(self, placeholder):
-        self.placeholder = placeholder
-        self.buffer = []
-        self.update_interval = 0.5  # seconds
-        self.last_update = time.time()
-
-    def write(self, text):
-        print(text, file=sys.__stdout__)  # Console output
-        self.buffer.append(text)
-
-        # Update display periodically
-        if time.time() - self.last_update > self.update_interval:
-            self._update_display()
-            self.last_update = time.time()
-
-    def _update_display(self):
-        if not self.buffer:
-            return
-
-        # Process all buffered text at once
-        full_text = "\n".join(self.buffer)
-        self.buffer = []  # Clear buffer
-
-        # Update display
-        self.placeholder.markdown(
-            f"""<div style='font-family: monospace; white-space: pre-wrap;'>
-            {full_text}</div>""",
-            unsafe_allow_html=True,
+# Seconds between refreshes of a running job's progress
+POLL_INTERVAL = 0.5
+
+
+@st.fragment(run_every=POLL_INTERVAL)
+def show_job_progress():
+    """
+    Show the progress of the running job and its partial answer, and add the answer
+    once it is done.
+    """
+    job = st.session_state.job
+    if job.done:
+        st.session_state.messages.append(
+            {"role": "assistant", "content": job.answer or f"Error: {job.error}"}
         )
+        st.session_state.job = None
+        st.rerun()
+
+    events = job.events()
+    with st.status(f"Working on it... ({job.elapsed:.0f}s)", expanded=True):
+        if not events:
+            st.markdown("Starting the agents...")
+        for event in events:
+            if event.type == "task":
+                st.markdown(f"**{event.agent}** finished its task")
+            elif event.type == "step":
+                st.markdown(event.content)
+
+    # The answer is shown as the synthesizer writes it
+    partial_answer = job.partial_answer()
+    if partial_answer:
+        st.markdown(partial_answer + "▌")
 
 
 with tab1:
@@ -130,50 +135,24 @@ with tab1:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
 
+    # Jobs run in the background and survive reruns; their progress is polled
+    if "job" not in st.session_state:
+        st.session_state.job = None
+    if st.session_state.job is not None:
+        with st.chat_message("assistant"):
+            show_job_progress()
+
     # Chat input
-    if prompt := st.chat_input("What would you like to know about the meetings?"):
-        # Add user message to chat history
+    if prompt := st.chat_input(
+        "What would you like to know about the meetings?",
+        disabled=st.session_state.job is not None,
+    ):
+        # Add user message to chat history and start answering it
         st.session_state.messages.append({"role": "user", "content": prompt})
-
-        # Display user message
-        with st.chat_message("user"):
-            st.markdown(prompt)
-
-        # Display assistant response with loading indicator
-        with st.chat_message("assistant"):
-            message_placeholder = st.empty()
-            progress_bar = st.progress(0)
-            console_placeholder = st.empty()
-
-            try:
-                # Create custom console output handler
-                console_output = ConsoleOutput(console_placeholder)
-
-                # Redirect stdout and stderr to our custom handler
-                with (
-                    contextlib.redirect_stdout(console_output),
-                    contextlib.redirect_stderr(console_output),
-                ):
-                    progress_bar.progress(0.3)
-                    full_response = get_crew_response(prompt)
-                    progress_bar.progress(1.0)
-
-                # Add to chat history
-                st.session_state.messages.append(
-                    {"role": "assistant", "content": full_response}
-                )
-
-                # Show response
-                message_placeholder.markdown(full_response)
-
-            except Exception as e:
-                error_message = f"Error: {str(e)}"
-                message_placeholder.error(error_message)
-                console_placeholder.code(f"Error occurred:\n{str(e)}")
-
-            finally:
-                # Clean up
-                progress_bar.empty()
+        st.session_state.job = CrewJob(
+            prompt, get_execution_profile(analysis_depth, search_limit)
+        )
+        st.rerun()
 
 with tab2:
     st.header("About this Assistant")
@@ -214,29 +193,7 @@ with tab2:
     Technologies used:
     - CrewAI for agent orchestration
     - Qdrant for vector search
-    - OpenAI for embeddings
+    - OpenAI models for the agents
     - Anthropic's Claude for analysis
-    - Sentence Transformers for encoding
+    - all-MiniLM-L6-v2 embeddings (PyTorch, ONNX Runtime or FastEmbed)
     """)
-
-# Add a sidebar with additional controls if needed
-with st.sidebar:
-    st.header("Settings")
-
-    # Add any configuration options
-    st.subheader("Search Settings")
-    search_limit = st.slider("Number of results", 1, 10, 5)
-
-    st.subheader("Analysis Settings")
-    analysis_depth = st.select_slider(
-        "Analysis Depth", options=["Basic", "Standard", "Detailed"], value="Standard"
-    )
-
-    # Add a clear chat button
-    if st.button("Clear Chat History"):
-        st.session_state.messages = []
-        st.rerun()
-
-    # Add version info
-    st.markdown("---")
-    st.markdown("v1.0.0")
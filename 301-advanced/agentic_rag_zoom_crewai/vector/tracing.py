@@ -0,0 +1,287 @@
+import argparse
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+SERVICE_NAME = "meeting-assistant"
+
+# OTLP status codes
+STATUS_CODE_UNSET = 0
+STATUS_CODE_ERROR = 2
+SPAN_KIND_INTERNAL = 1
+
+
+def tracing_mode() -> str:
+    """
+    TRACING: "off" (default), "file" to append spans as JSON lines to the trace file,
+    or "otel" to export them with the OpenTelemetry SDK, configured by the standard
+    OTEL_* variables. Read on every span, so .env.local and later changes apply.
+    """
+    return os.getenv("TRACING", "off")
+
+
+def trace_file() -> Path:
+    return Path(
+        os.getenv(
+            "TRACE_FILE", Path(__file__).parent.parent / ".cache" / "traces.jsonl"
+        )
+    )
+
+
+_current_span: contextvars.ContextVar[Optional["FileSpan"]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+_write_lock = threading.Lock()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """An attribute value in the OTLP JSON encoding."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {"key": key, "value": _otlp_value(value)} for key, value in attributes.items()
+    ]
+
+
+class FileSpan:
+    """
+    A span written when it ends as one line of OTLP JSON, the format of the OTLP/HTTP
+    JSON protocol and of the OpenTelemetry Collector's file exporter, so the file can be
+    read e.g. by the Collector's `otlpjsonfile` receiver.
+    """
+
+    def __init__(self, name: str, parent: Optional["FileSpan"], attributes: Dict):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent else None
+        self.attributes = dict(attributes)
+        self.status_code = STATUS_CODE_UNSET
+        self.status_message = ""
+        self.start_time_unix_nano = time.time_ns()
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_exception(self, exception: BaseException):
+        self.status_code = STATUS_CODE_ERROR
+        self.status_message = str(exception)
+        self.attributes["exception.type"] = type(exception).__name__
+        self.attributes["exception.message"] = str(exception)
+
+    def end(self):
+        otlp_span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_time_unix_nano),
+            "endTimeUnixNano": str(time.time_ns()),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status_code, "message": self.status_message},
+        }
+        if self.parent_span_id:
+            otlp_span["parentSpanId"] = self.parent_span_id
+        record = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes({"service.name": SERVICE_NAME})
+                    },
+                    "scopeSpans": [
+                        {"scope": {"name": SERVICE_NAME}, "spans": [otlp_span]}
+                    ],
+                }
+            ]
+        }
+        path = trace_file()
+        with _write_lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+
+class _NoopSpan:
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def record_exception(self, exception: BaseException):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+@functools.lru_cache(maxsize=None)
+def _otel_tracer():
+    """The OpenTelemetry tracer, or None if the SDK is not installed."""
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        print("LOG: OpenTelemetry SDK not installed, writing traces to a file")
+        return None
+
+    provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    except ImportError:
+        print("LOG: OTLP exporter not installed, spans are not exported")
+    trace.set_tracer_provider(provider)
+    return trace.get_tracer(SERVICE_NAME)
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes) -> Iterator[Any]:
+    """
+    Record the enclosed block as a span, nested under the current span. The yielded
+    span accepts `set_attribute(key, value)`. A no-op unless TRACING is enabled.
+    """
+    mode = tracing_mode()
+    tracer = _otel_tracer() if mode == "otel" else None
+    if tracer is not None:
+        with tracer.start_as_current_span(name, attributes=attributes) as otel_span:
+            yield otel_span
+        return
+    if mode not in ("file", "otel"):
+        yield NOOP_SPAN
+        return
+
+    file_span = FileSpan(name, _current_span.get(), attributes)
+    token = _current_span.set(file_span)
+    try:
+        yield file_span
+    except BaseException as e:
+        file_span.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        file_span.end()
+
+
+def traced(name: str) -> Callable:
+    """Decorator recording every call of the function as a span."""
+
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def current_span() -> Any:
+    """The innermost active span, to add attributes to it."""
+    if tracing_mode() == "otel" and _otel_tracer() is not None:
+        from opentelemetry import trace
+
+        return trace.get_current_span()
+    return _current_span.get() or NOOP_SPAN
+
+
+def in_current_context(function: Callable) -> Callable:
+    """
+    Bind the function to the current trace context, so spans it records in other
+    threads, e.g. in an executor, are nested under the current span.
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        # A context can only be entered by one thread at a time, so run in a copy
+        return context.copy().run(function, *args, **kwargs)
+
+    return wrapper
+
+
+def record_usage(target: Any, input_tokens: int, output_tokens: int):
+    """Record LLM token usage on a span."""
+    target.set_attribute("gen_ai.usage.input_tokens", input_tokens)
+    target.set_attribute("gen_ai.usage.output_tokens", output_tokens)
+
+
+def _file_spans(path: Path) -> Iterator[Dict[str, Any]]:
+    """The spans of an OTLP JSON lines file."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for resource_spans in json.loads(line).get("resourceSpans", []):
+                for scope_spans in resource_spans.get("scopeSpans", []):
+                    yield from scope_spans.get("spans", [])
+
+
+def summarize(path: Optional[Path] = None) -> Dict[str, Dict[str, float]]:
+    """Count and duration percentiles (ms) per span name of a trace file."""
+    durations: Dict[str, list] = {}
+    for otlp_span in _file_spans(path or trace_file()):
+        milliseconds = (
+            int(otlp_span["endTimeUnixNano"]) - int(otlp_span["startTimeUnixNano"])
+        ) / 1e6
+        durations.setdefault(otlp_span["name"], []).append(milliseconds)
+
+    summary = {}
+    for name, values in sorted(durations.items()):
+        values.sort()
+        summary[name] = {
+            "count": len(values),
+            "p50_ms": round(values[len(values) // 2], 3),
+            "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))], 3),
+            "total_ms": round(sum(values), 3),
+        }
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a trace file")
+    parser.add_argument("path", nargs="?", type=Path, default=None)
+    parser.add_argument(
+        "--budget",
+        action="append",
+        default=[],
+        metavar="SPAN=MS",
+        help="Fail if the p95 duration of a span exceeds the budget",
+    )
+    args = parser.parse_args()
+
+    summary = summarize(args.path)
+    print(f"{'span':<32} {'count':>7} {'p50 ms':>10} {'p95 ms':>10} {'total ms':>12}")
+    for name, stats in summary.items():
+        print(
+            f"{name:<32} {stats['count']:>7} {stats['p50_ms']:>10} "
+            f"{stats['p95_ms']:>10} {stats['total_ms']:>12}"
+        )
+
+    exceeded = []
+    for budget in args.budget:
+        name, milliseconds = budget.split("=")
+        if name in summary and summary[name]["p95_ms"] > float(milliseconds):
+            exceeded.append(f"{name} p95 {summary[name]['p95_ms']} ms > {milliseconds}")
+    for message in exceeded:
+        print(f"LOG: Budget exceeded: {message}")
+    sys.exit(1 if exceeded else 0)
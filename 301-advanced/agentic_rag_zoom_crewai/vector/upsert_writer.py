@@ -0,0 +1,212 @@
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from collection_profiles import QDRANT_SPAN_ATTRIBUTES
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+from tracing import span
+
+RETRY_QUEUE_DIR = Path(__file__).parent.parent / ".cache" / "upsert_queue"
+
+# Parallel upsert requests, and the request latency the batch sizes are tuned towards
+UPSERT_MAX_IN_FLIGHT = int(os.getenv("UPSERT_MAX_IN_FLIGHT", 4))
+UPSERT_TARGET_LATENCY = float(os.getenv("UPSERT_TARGET_LATENCY", 1.0))
+
+
+class RetryQueue:
+    """
+    Append-only JSON lines file of point batches that could not be upserted. Each batch
+    is fsynced when it is added, so it survives a crash until it is replayed.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of queued batches, including those of an interrupted replay."""
+        count = 0
+        for path in (self.path, self.path.with_suffix(".replaying")):
+            if path.exists():
+                with open(path, "r", encoding="utf-8") as f:
+                    count += sum(1 for line in f if line.strip())
+        return count
+
+    def add(self, points: List[models.PointStruct]):
+        line = json.dumps([point.model_dump(mode="json") for point in points])
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def drain(self, write: Callable[[Iterable[models.PointStruct]], Any]) -> Any:
+        """
+        Pass the points of all the queued batches to `write`, and drop them once it
+        returns. Upserts are idempotent, so batches interrupted mid-replay are simply
+        replayed again on the next drain.
+        """
+        replaying = self.path.with_suffix(".replaying")
+        with self._lock:
+            # Moved to the replay file, so batches failing again are queued anew
+            if self.path.exists():
+                with open(self.path, "r", encoding="utf-8") as queued:
+                    with open(replaying, "a", encoding="utf-8") as f:
+                        f.write(queued.read())
+                self.path.unlink()
+        if not replaying.exists():
+            return None
+
+        def points() -> Iterator[models.PointStruct]:
+            with open(replaying, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        for point in json.loads(line):
+                            yield models.PointStruct(**point)
+
+        result = write(points())
+        replaying.unlink()
+        return result
+
+    def clear(self):
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+            self.path.with_suffix(".replaying").unlink(missing_ok=True)
+
+
+class UpsertWriter:
+    """
+    Upsert points in batches sized by their serialized bytes. The batch size adapts to
+    the observed latency: it grows while requests finish well under `target_latency`
+    and halves when they are slower or fail. Up to `max_in_flight` requests run in
+    parallel, failed requests are retried with exponential backoff, and batches that
+    still fail are added to a durable retry queue, replayed by `replay`. After a batch
+    is queued, later batches are tried only once until a request succeeds again, so an
+    unreachable Qdrant does not stall ingestion. The in-process Qdrant of local mode is
+    not thread-safe, so its requests are sent one at a time.
+    """
+
+    def __init__(
+        self,
+        client: QdrantClient,
+        collection_name: str,
+        retry_queue: Optional[RetryQueue] = None,
+        max_in_flight: int = UPSERT_MAX_IN_FLIGHT,
+        target_latency: float = UPSERT_TARGET_LATENCY,
+        initial_batch_bytes: int = 1 << 20,
+        min_batch_bytes: int = 64 << 10,
+        max_batch_bytes: int = 16 << 20,
+        max_batch_points: int = 1000,
+        max_retries: int = 4,
+        backoff: float = 0.5,
+    ):
+        self.client = client
+        self.collection_name = collection_name
+        self.retry_queue = retry_queue or RetryQueue(
+            RETRY_QUEUE_DIR / f"{collection_name}.jsonl"
+        )
+        options = client.init_options
+        local = options.get("location") == ":memory:" or options.get("path")
+        self.max_in_flight = 1 if local else max_in_flight
+        self.target_latency = target_latency
+        self.batch_bytes = initial_batch_bytes
+        self.min_batch_bytes = min_batch_bytes
+        self.max_batch_bytes = max_batch_bytes
+        self.max_batch_points = max_batch_points
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._failing = False
+        self._lock = threading.Lock()
+
+    def _adapt(self, seconds: Optional[float]):
+        """Resize the batches after a request took `seconds`, or None if it failed."""
+        with self._lock:
+            if seconds is None or seconds > self.target_latency:
+                self.batch_bytes = max(self.min_batch_bytes, self.batch_bytes // 2)
+            elif seconds < self.target_latency / 2:
+                self.batch_bytes = min(
+                    self.max_batch_bytes, int(self.batch_bytes * 1.25)
+                )
+
+    def _send(self, batch: List[models.PointStruct], size: int) -> bool:
+        """Upsert one batch with retries, queueing it if it keeps failing."""
+        retries = 0 if self._failing else self.max_retries
+        for attempt in range(retries + 1):
+            start = time.perf_counter()
+            try:
+                with span(
+                    "qdrant.upsert",
+                    points=len(batch),
+                    bytes=size,
+                    attempt=attempt,
+                    **QDRANT_SPAN_ATTRIBUTES,
+                ):
+                    self.client.upsert(
+                        collection_name=self.collection_name, points=batch, wait=True
+                    )
+                self._adapt(time.perf_counter() - start)
+                self._failing = False
+                return True
+            except Exception as e:
+                self._adapt(None)
+                if attempt == retries:
+                    print(f"LOG: Upsert of {len(batch)} points failed, queueing: {e}")
+                    self.retry_queue.add(batch)
+                    self._failing = True
+                    return False
+                delay = self.backoff * 2**attempt * random.uniform(0.5, 1.5)
+                print(f"LOG: Upsert failed, retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+
+    def write(self, points: Iterable[models.PointStruct]) -> Dict[str, int]:
+        """Upsert all the points, returning the numbers of written and queued points."""
+        stats = {"written": 0, "queued": 0, "batches": 0}
+        in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        stats_lock = threading.Lock()
+
+        def send(batch: List[models.PointStruct], size: int):
+            try:
+                ok = self._send(batch, size)
+                with stats_lock:
+                    stats["written" if ok else "queued"] += len(batch)
+                    stats["batches"] += 1
+            finally:
+                in_flight.release()
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            batch: List[models.PointStruct] = []
+            size = 0
+            for point in points:
+                batch.append(point)
+                size += len(point.model_dump_json())
+                if size >= self.batch_bytes or len(batch) >= self.max_batch_points:
+                    # Block until a request slot is free, so batches don't pile up
+                    in_flight.acquire()
+                    executor.submit(send, batch, size)
+                    batch, size = [], 0
+            if batch:
+                in_flight.acquire()
+                executor.submit(send, batch, size)
+
+        print(
+            f"LOG: Upserted {stats['written']} points in {stats['batches']} batches, "
+            f"{stats['queued']} queued for retry"
+        )
+        return stats
+
+    def replay(self) -> Dict[str, int]:
+        """Upsert the batches left in the retry queue by earlier runs."""
+        if len(self.retry_queue):
+            print(f"LOG: Replaying {len(self.retry_queue)} queued upsert batches")
+        return self.retry_queue.drain(self.write) or {
+            "written": 0,
+            "queued": 0,
+            "batches": 0,
+        }